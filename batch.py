@@ -0,0 +1,159 @@
+"""Play many seeded headless matches on every CPU core and aggregate the results.
+
+Usage:
+    python batch.py --matches 1000 --output report.json
+    python batch.py --matches 200 --set ENEMY_SPEED=2 --set ENEMY_COUNT=10 --results matches.jsonl
+"""
+import headless  # Selects the dummy SDL drivers before pygame is initialized
+
+import argparse
+import ast
+import json
+import multiprocessing
+import os
+import statistics
+import time
+from functools import partial
+
+from constants.game_rules import GAME_RULES
+from utils.profiler import profiler
+
+
+def parse_override(text):
+    """Turn "NAME=value" into (NAME, value), the value read as a Python literal."""
+    name, _, value = text.partition("=")
+    if name not in GAME_RULES:
+        raise argparse.ArgumentTypeError(f"unknown GAME_RULES key: {name}")
+    try:
+        return name, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        raise argparse.ArgumentTypeError(f"not a Python literal: {value}")
+
+
+def init_worker(overrides):
+    """Apply the rule overrides and turn on phase timing in each worker process."""
+    GAME_RULES.update(overrides)
+    profiler.enabled = True
+    profiler.max_events = 0  # Only the per-phase totals are needed
+
+
+def play(seed, agent_name, max_ticks):
+    """Worker: one match, with the milliseconds spent in each phase."""
+    profiler.reset()
+    result = headless.run_match(seed, agent_name, max_ticks)
+    result["phases_ms"] = dict(profiler.totals)
+    return result
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def aggregate(results, wall_seconds, workers):
+    """Summarize per-match results into one report; the statistics are None without results."""
+    tick_rate = GAME_RULES["TICK_RATE"]
+    survival = sorted(result["ticks"] / tick_rate for result in results)
+    kills = [result["kills"] for result in results]
+    total_ticks = sum(result["ticks"] for result in results)
+
+    phases = {}
+    for result in results:
+        for name, ms in result["phases_ms"].items():
+            phases[name] = phases.get(name, 0) + ms
+
+    return {
+        "matches": len(results),
+        "workers": workers,
+        "deaths": sum(result["died"] for result in results),
+        "survival_seconds": {
+            "mean": statistics.fmean(survival),
+            "median": statistics.median(survival),
+            "p5": percentile(survival, 0.05),
+            "p95": percentile(survival, 0.95)
+        } if results else None,
+        "kills": {
+            "mean": statistics.fmean(kills),
+            "max": max(kills)
+        } if results else None,
+        "ticks": total_ticks,
+        "wall_seconds": wall_seconds,
+        "ticks_per_second": total_ticks / wall_seconds if wall_seconds else float("inf"),
+        # Mean milliseconds per simulated tick, summed over every match
+        "phase_ms_per_tick": {name: ms / total_ticks for name, ms in phases.items()} if total_ticks else {}
+    }
+
+
+def run_batch(matches, agent_name="scripted", max_ticks=36000, first_seed=0,
+              workers=None, overrides=None, on_result=None):
+    """Play matches seeded first_seed, first_seed + 1, ... across worker processes.
+
+    on_result is called in this process with each match's result as it
+    finishes, in completion order. Returns the aggregated report.
+    """
+    workers = workers or os.cpu_count()
+    overrides = overrides or {}
+    seeds = range(first_seed, first_seed + matches)
+    task = partial(play, agent_name=agent_name, max_ticks=max_ticks)
+
+    results = []
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers, init_worker, (overrides,)) as pool:
+        # Small chunks keep every core busy even when match lengths differ a lot
+        for result in pool.imap_unordered(task, seeds, chunksize=4):
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+        # Let the workers exit on their own; the context manager would terminate them
+        pool.close()
+        pool.join()
+    wall_seconds = time.perf_counter() - start
+
+    GAME_RULES.update(overrides)  # So the report uses the same TICK_RATE
+    report = aggregate(results, wall_seconds, workers)
+    report["agent"] = agent_name
+    report["max_ticks"] = max_ticks
+    report["overrides"] = overrides
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--agent", choices=sorted(headless.AGENTS), default="scripted")
+    parser.add_argument("--max-ticks", type=int, default=36000,
+                        help="end a match as survived after this many ticks")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first match")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--set", dest="overrides", type=parse_override, action="append",
+                        default=[], metavar="NAME=VALUE", help="override a GAME_RULES entry")
+    parser.add_argument("--results", help="stream every match result to this JSON lines file")
+    parser.add_argument("--output", help="write the aggregated report to this JSON file")
+    args = parser.parse_args()
+
+    results_file = open(args.results, "w") if args.results else None
+    finished = 0
+
+    def on_result(result):
+        nonlocal finished
+        finished += 1
+        if results_file is not None:
+            results_file.write(json.dumps(result) + "\n")
+        if finished % max(1, args.matches // 20) == 0 or finished == args.matches:
+            print(f"{finished}/{args.matches} matches")
+
+    try:
+        report = run_batch(args.matches, args.agent, args.max_ticks, args.seed,
+                           args.workers, dict(args.overrides), on_result)
+    finally:
+        if results_file is not None:
+            results_file.close()
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Reproducible benchmarks for the update, pathfinding and render phases.
+
+Usage:
+    python benchmark.py --output results.json
+    python benchmark.py --compare baseline.json results.json
+"""
+import headless  # Selects the dummy SDL drivers before pygame is initialized
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import pygame
+
+import main
+from entities.enemy import Enemy
+from entities.maze import Maze
+from entities.player import Player
+from entities.projectile import ProjectilePool
+from utils.flow_field import FlowField
+from utils.maze_generator import build_grid
+from utils.dirty_rects import dirty_rects
+from utils.replay import KeyBits
+from utils.sim_clock import sim_clock
+from utils.sound_manager import sound_manager
+from utils.window import window
+
+PHASES = ["update_enemies", "update_projectiles",
+          "find_path", "maze_draw", "render"]
+
+# name -> (enemy count, projectile count, maze variant, maze size)
+SCENARIOS = {
+    "baseline": (5, 0, "stock", None),
+    "enemies_50": (50, 0, "stock", None),
+    "enemies_200": (200, 0, "stock", None),
+    "projectiles_200": (5, 200, "stock", None),
+    "projectiles_1000": (5, 1000, "stock", None),
+    "backtracker_201": (5, 0, "backtracker", 201),
+    "rooms_501": (5, 0, "rooms", 501),
+    "rooms_501_enemies_200": (200, 200, "rooms", 501)
+}
+
+
+def refill_projectiles(projectiles, count, player, rng):
+    """Keep count projectiles in flight, fired in random directions around the player."""
+    while len(projectiles) < count:
+        projectiles.acquire(player.x, player.y,
+                            player.x + rng.uniform(-500, 500),
+                            player.y + rng.uniform(-500, 500),
+                            rng.random() < 0.5, "mini_gun_projectile.png")
+
+
+def run_scenario(enemy_count, projectile_count, maze_variant, maze_size, frames, seed):
+    """Run one scenario.
+
+    Returns the mean and p95 microseconds per frame of each phase, and the
+    mean number of projectile-entity pairs tested per frame.
+    """
+    random.seed(seed)
+    sim_clock.reset()
+    dirty_rects.enabled = False  # Always time the full redraw
+    rng = random.Random(seed)
+    maze = Maze(build_grid(maze_variant, maze_size, maze_size, seed))
+    player = Player(maze)
+    enemies = [Enemy(maze) for _ in range(enemy_count)]
+    projectiles = ProjectilePool()
+    flow_field = FlowField(maze)
+    agent = headless.ScriptedAgent(seed)
+
+    samples = {phase: [] for phase in PHASES}
+    for frame in range(frames):
+        player.health = 10  # Never die, so every scenario runs all its frames
+        keys, _, _ = agent.act(player, enemies, frame)
+        player.move(KeyBits(keys), maze)
+        refill_projectiles(projectiles, projectile_count, player, rng)
+        camera_x, camera_y = main.get_camera(player)
+
+        start = time.perf_counter_ns()
+        main.update_enemies(enemies, player, projectiles, flow_field)
+        samples["update_enemies"].append(time.perf_counter_ns() - start)
+
+        start = time.perf_counter_ns()
+        main.update_projectiles(projectiles, maze, player, enemies)
+        samples["update_projectiles"].append(time.perf_counter_ns() - start)
+
+        # One full A* search per frame, rotating through the enemies
+        enemy = enemies[frame % len(enemies)]
+        enemy.set_target(player)
+        start = time.perf_counter_ns()
+        enemy.find_path()
+        samples["find_path"].append(time.perf_counter_ns() - start)
+
+        start = time.perf_counter_ns()
+        maze.draw(window.get_surface(), camera_x, camera_y)
+        samples["maze_draw"].append(time.perf_counter_ns() - start)
+
+        start = time.perf_counter_ns()
+        main.render(maze, player, enemies, projectiles, camera_x, camera_y)
+        samples["render"].append(time.perf_counter_ns() - start)
+
+        sim_clock.advance()
+
+    results = {}
+    for phase, values in samples.items():
+        values.sort()
+        results[phase] = {
+            "mean_us": sum(values) / len(values) / 1000,
+            "p95_us": values[int(len(values) * 0.95)] / 1000
+        }
+    return results, projectiles.stats()["narrow_phase_tests_per_tick"]
+
+
+def run_benchmarks(names, frames, seed):
+    sound_manager.enabled = False
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "frames": frames,
+            "seed": seed
+        },
+        "scenarios": {}
+    }
+    for name in names:
+        enemy_count, projectile_count, maze_variant, maze_size = SCENARIOS[name]
+        phases, narrow_phase_tests = run_scenario(
+            enemy_count, projectile_count, maze_variant, maze_size, frames, seed)
+        report["scenarios"][name] = {
+            "enemies": enemy_count,
+            "projectiles": projectile_count,
+            "maze": maze_variant,
+            "maze_size": maze_size,
+            "narrow_phase_tests_per_frame": narrow_phase_tests,
+            "phases": phases
+        }
+        print(f"{name}: " + ", ".join(
+            f"{phase} {timing['mean_us']:.0f}us" for phase, timing in report["scenarios"][name]["phases"].items()),
+            file=sys.stderr)
+    return report
+
+
+def compare(baseline_path, current_path, threshold):
+    """Print the change of every phase mean; return True if any regressed past threshold percent."""
+    with open(baseline_path) as file:
+        baseline = json.load(file)["scenarios"]
+    with open(current_path) as file:
+        current = json.load(file)["scenarios"]
+
+    regressed = False
+    for name in sorted(set(baseline) & set(current)):
+        for phase in PHASES:
+            before = baseline[name]["phases"][phase]["mean_us"]
+            after = current[name]["phases"][phase]["mean_us"]
+            change = (after - before) / before * 100 if before else 0.0
+            marker = ""
+            if change > threshold:
+                marker = "  REGRESSION"
+                regressed = True
+            print(f"{name:24} {phase:20} {before:10.1f}us -> {after:10.1f}us {change:+7.1f}%{marker}")
+    return regressed
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Run only these scenarios (repeatable)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Diff two result files instead of running")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent slowdown reported as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    report = run_benchmarks(args.scenario or list(SCENARIOS), args.frames, args.seed)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
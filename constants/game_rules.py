@@ -1,17 +1,37 @@
-import pygame
-
-# TODO: don't think this belongs here.
-pygame.init()
-info = pygame.display.Info()
-SCREEN_WIDTH, SCREEN_HEIGHT = info.current_w, info.current_h
-
+# The screen size comes from utils/window, which asks the display only when needed
 GAME_RULES = {
-    "FPS": 60,
+    "FPS": 60,  # Render cap; 0 renders as fast as the display allows
+    "DIRTY_RECTS": True,  # Update only changed screen areas while the camera is still
+    "TICK_RATE": 60,  # Fixed simulation ticks per second; speeds are per tick
     "TILE_SIZE": 50,
     "PLAYER_SIZE": 40,
     "ENEMY_SIZE": 40,
     "PROJECTILE_SIZE": 20,
     "ENEMY_COUNT": 5,
     "PLAYER_SPEED": 3,
-    "ENEMY_SPEED": 1
+    "ENEMY_SPEED": 1,
+    "ROTATION_STEPS": 64,  # Pre-rotated sprite angles, e.g. 64 or 128
+    "PRELOAD_THREADS": 0,  # Worker threads decoding assets at startup; 0 is one per CPU
+    "MAZE_CHUNK_TILES": 16,  # Tiles per side of a cached maze background chunk
+    "COLLISION_CELL_SIZE": 50,  # Broadphase cell size, at least half a tile
+    "PATHFINDING": "flow_field",  # "flow_field" shared by all enemies, or "astar" / "hpa" per enemy
+    # Tiles a flow field rebuild expands per tick; 0 is no limit. A big map's rebuild is
+    # spread over several ticks, with the enemies following the old field meanwhile
+    "FLOW_FIELD_BUDGET_NODES": 2000,
+    # Nodes expanded per tick in "astar" and "hpa" modes, longer searches carrying on next
+    # tick; 0 is no limit. About 1ms of planning, and the same on every machine, so seeded
+    # runs and replays repeat exactly
+    "PATH_BUDGET_NODES": 200,
+    # Planning time per tick on top of the node budget; 0 is no limit. Caps the frame
+    # time on slow machines, but how many enemies fit then varies from run to run
+    "PATH_BUDGET_US": 0,
+    "HPA_CLUSTER_TILES": 16,  # Tiles per side of a hierarchical pathfinding cluster
+    # "stock", "backtracker", "rooms" or the path of a map file
+    "MAZE_VARIANT": "stock",
+    "GENERATED_MAZE_SIZE": (101, 101),  # Width and height in tiles for generated mazes
+    "PROJECTILE_POOL_CAPACITY": 256,  # Projectile slots preallocated per round
+    "PROJECTILE_POOL_HIGH_WATER": 4096,  # Most projectiles in flight; extra shots are dropped
+    "ENEMY_POOL_HIGH_WATER": 64,  # Most idle enemies kept for reuse
+    "PROFILER_HISTORY": 240,  # Frames shown in the profiler's frame-time graph
+    "PROFILER_MAX_TRACE_EVENTS": 500000  # Trace events kept before new ones are dropped
 }
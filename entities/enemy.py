@@ -1,38 +1,41 @@
-import pygame
-import time
 import heapq
 import math
-import random
 
-from constants.file_paths import *
 from constants.game_rules import GAME_RULES
-from constants.maze_variants import MAZE, MAZE_WIDTH, MAZE_HEIGHT
-from entities.projectile import Projectile
+from utils.asset_manager import asset_manager, rotated
+from utils.hpa import pathfinder_for
+from utils.sim_clock import sim_clock
+from utils.profiler import profiled
 
 
 class Enemy:
-    def __init__(self, maze):
-
-        self.enemy_image = pygame.image.load(f"{IMAGES_FOLDER}/enemy.png")
-        self.enemy_image = pygame.transform.smoothscale(
-            self.enemy_image, (GAME_RULES["ENEMY_SIZE"], GAME_RULES["ENEMY_SIZE"]))
-        while True:
-            x = random.randint(1, MAZE_WIDTH - 2)
-            y = random.randint(1, MAZE_HEIGHT - 2)
-
-            # Ensure the enemy doesn't spawn inside a wall
-            if MAZE[y][x] == 0:  # 0 means walkable space
-                self.x = x * GAME_RULES["TILE_SIZE"]
-                self.y = y * GAME_RULES["TILE_SIZE"]
-                self.health = 3  # Reset health
-                break  # Found a valid position, exit loop
+    def __init__(self, maze, clock=None):
+
+        self.enemy_image = asset_manager.get_image(
+            "enemy.png", (GAME_RULES["ENEMY_SIZE"], GAME_RULES["ENEMY_SIZE"]))
+        self.enemy_rotations = asset_manager.get_rotations(
+            "enemy.png", (GAME_RULES["ENEMY_SIZE"], GAME_RULES["ENEMY_SIZE"]))
+        self.clock = clock or sim_clock
+        self.reset(maze)
+
+    def reset(self, maze):
+        """Start over as a new enemy on maze, e.g. when recycled for the next round."""
+        # Ensure the enemy doesn't spawn inside a wall
+        x, y = maze.random_walkable_tile()
+        self.x = x * GAME_RULES["TILE_SIZE"]
+        self.y = y * GAME_RULES["TILE_SIZE"]
+        self.prev_x, self.prev_y = self.x, self.y  # Position at the start of the tick
         self.speed = GAME_RULES["ENEMY_SPEED"]
         self.health = 3
         self.path = []
+        self.waypoints = []  # Hierarchical waypoints still to refine after self.path
         self.target = None
-        self.last_damage_time = time.time()
-        self.last_shot_time = time.time()  # Time the enemy last shot
-        self.maze_grid = maze.grid if hasattr(maze, 'grid') else maze
+        self.planned_tick = -1  # Simulation tick of the last finished find_path
+        self.planner = None  # Search that ran out of budget, resumed by the next find_path
+        self.planned_from = None  # Tile the search started from
+        self.last_damage_time = self.clock.time()
+        self.last_shot_time = self.clock.time()  # Time the enemy last shot
+        self.maze = maze
         self.sound_index = 0
 
     def set_target(self, player):
@@ -42,12 +45,11 @@ class Enemy:
 
     def fire_projectile(self, player, projectiles):
         """Fire a projectile towards the player every 3 seconds if the player is in line of sight."""
-        current_time = time.time()
+        current_time = self.clock.time()
         if current_time - self.last_shot_time >= 3 and self.is_in_line_of_sight(player):
             # Fire the projectile
-            projectile = Projectile(
-                self.x, self.y, player.x + GAME_RULES["TILE_SIZE"] // 2, player.y + GAME_RULES["TILE_SIZE"] // 2, False, "plasma_gun_projectile.png")
-            projectiles.append(projectile)  # Add projectile to the list
+            projectiles.acquire(
+                self.x, self.y, player.x + GAME_RULES["TILE_SIZE"] // 2, player.y + GAME_RULES["TILE_SIZE"] // 2, False, "plasma_gun_projectile.png")  # Add projectile to the pool
             self.last_shot_time = current_time  # Update last shot time
             # shoot_sounds[self.sound_index].play()
             # self.sound_index = (self.sound_index + 1) % len(shoot_sounds)
@@ -56,15 +58,49 @@ class Enemy:
         """Manhattan distance heuristic for A*."""
         return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
-    def find_path(self):
-        """Uses A* algorithm to find a path to the player while avoiding walls, allowing diagonal movement."""
-        if not self.target:
-            return
-
-        start = (self.x // GAME_RULES["TILE_SIZE"],
-                 self.y // GAME_RULES["TILE_SIZE"])
-        goal = self.target
-
+    def needs_path(self):
+        """True if the current path doesn't lead to the target."""
+        if not self.path and not self.waypoints:
+            return True
+        destination = self.waypoints[-1] if self.waypoints else self.path[-1]
+        return self.target and destination != self.target
+
+    @profiled("find_path")
+    def find_path(self, node_budget=None):
+        """Plan a path to the target with A* (or HPA*), expanding at most node_budget nodes.
+
+        A search that runs out of budget is kept in self.planner and resumed
+        by the next call, still towards the target it started with; it is
+        done once self.planner is None. Returns the number of nodes
+        expanded, for planning budgets.
+        """
+        if self.planner is None:
+            if not self.target:
+                return 0
+            start = (self.x // GAME_RULES["TILE_SIZE"],
+                     self.y // GAME_RULES["TILE_SIZE"])
+            if GAME_RULES["PATHFINDING"] == "hpa":
+                # Plan over cluster entrances; only the first stretch becomes tiles now
+                self.planner = pathfinder_for(self.maze).plan(start, self.target)
+            else:
+                self.planner = self.plan_tiles(start, self.target)
+            self.planned_from = start
+
+        expanded = 0
+        try:
+            while node_budget is None or expanded < node_budget:
+                next(self.planner)
+                expanded += 1
+        except StopIteration as done:
+            self.planner = None
+            self.use_plan(done.value)
+        return expanded
+
+    def plan_tiles(self, start, goal):
+        """A* over tiles, allowing diagonal movement, as a generator yielding after each node expanded.
+
+        Returns the tiles after start up to goal, or [] if there is no path.
+        """
         # Include diagonal directions: Up, Down, Left, Right, and all diagonals
         directions = [
             (0, -1), (0, 1), (-1, 0), (1, 0),  # Cardinal directions
@@ -79,42 +115,66 @@ class Enemy:
 
         while open_set:
             _, current = heapq.heappop(open_set)
+            yield
 
             if current == goal:
                 # Reconstruct path
-                self.path = []
+                path = []
                 while current in came_from:
-                    self.path.insert(0, current)
+                    path.insert(0, current)
                     current = came_from[current]
-                return
+                return path
 
             for dx, dy in directions:
                 neighbor = (current[0] + dx, current[1] + dy)
 
-                # Ensure diagonal movement is valid (no walls blocking movement)
-                if 0 <= neighbor[0] < MAZE_WIDTH and 0 <= neighbor[1] < MAZE_HEIGHT:
-                    # Check if it's walkable
-                    if self.maze_grid[neighbor[1]][neighbor[0]] == 0:
-
-                        # Check for diagonal wall collisions
-                        if abs(dx) + abs(dy) == 2:  # Diagonal move
-                            # Ensure diagonals aren't blocked by corner walls
-                            if self.maze_grid[current[1]][neighbor[0]] == 1 and self.maze_grid[neighbor[1]][current[0]] == 1:
-                                continue  # If both adjacent tiles are walls, don't move diagonally
-
-                        # Diagonal is slightly longer
-                        temp_g_score = g_score[current] + \
-                            (1.4 if abs(dx) + abs(dy) == 2 else 1)
-
-                        if neighbor not in g_score or temp_g_score < g_score[neighbor]:
-                            came_from[neighbor] = current
-                            g_score[neighbor] = temp_g_score
-                            f_score[neighbor] = temp_g_score + \
-                                self.heuristic(neighbor, goal)
-                            heapq.heappush(
-                                open_set, (f_score[neighbor], neighbor))
+                # Check if it's walkable (the maze's wall border covers the bounds)
+                if self.maze.is_walkable(neighbor[0], neighbor[1]):
+
+                    # Check for diagonal wall collisions
+                    if abs(dx) + abs(dy) == 2:  # Diagonal move
+                        # Ensure diagonals aren't blocked by corner walls
+                        if self.maze.is_wall(neighbor[0], current[1]) and self.maze.is_wall(current[0], neighbor[1]):
+                            continue  # If both adjacent tiles are walls, don't move diagonally
+
+                    # Diagonal is slightly longer
+                    temp_g_score = g_score[current] + \
+                        (1.4 if abs(dx) + abs(dy) == 2 else 1)
+
+                    if neighbor not in g_score or temp_g_score < g_score[neighbor]:
+                        came_from[neighbor] = current
+                        g_score[neighbor] = temp_g_score
+                        f_score[neighbor] = temp_g_score + \
+                            self.heuristic(neighbor, goal)
+                        heapq.heappush(
+                            open_set, (f_score[neighbor], neighbor))
+
+        return []  # No path found
+
+    def use_plan(self, result):
+        """Take over a finished search's tiles or waypoints, joined to where the enemy is now."""
+        if GAME_RULES["PATHFINDING"] == "hpa":
+            self.waypoints = result
+            self.path = []
+            self.refine_path()  # From the current tile
+            return
 
-        self.path = []  # No path found
+        # The enemy kept following its old path while the search ran
+        here = (self.x // GAME_RULES["TILE_SIZE"], self.y // GAME_RULES["TILE_SIZE"])
+        if here in result:
+            result = result[result.index(here) + 1:]
+        elif result and here != self.planned_from:
+            result.insert(0, self.planned_from)  # Step back onto the new path first
+        self.path = result
+
+    def refine_path(self):
+        """Turn the next hierarchical waypoint into tiles, once the last stretch is walked."""
+        if self.path or not self.waypoints:
+            return
+        start = (self.x // GAME_RULES["TILE_SIZE"], self.y // GAME_RULES["TILE_SIZE"])
+        self.path = pathfinder_for(self.maze).refine(start, self.waypoints.pop(0))
+        if not self.path:
+            self.waypoints = []  # Blocked since planning; replan from scratch
 
     def can_move_to(self, new_x, new_y):
         """Check if the enemy can move to the given position (collision check for all corners)."""
@@ -128,7 +188,7 @@ class Enemy:
 
         for cx, cy in corners:
             col, row = cx // GAME_RULES["TILE_SIZE"], cy // GAME_RULES["TILE_SIZE"]
-            if row < 0 or row >= MAZE_HEIGHT or col < 0 or col >= MAZE_WIDTH or self.maze_grid[row][col] == 1:
+            if self.maze.is_wall(col, row):
                 return False  # Collision detected
 
         return True  # No collisions
@@ -168,17 +228,34 @@ class Enemy:
             if (self.x, self.y) == (target_x, target_y):
                 self.path.pop(0)
 
-    def move_towards_target(self):
-        """Finds a path and moves toward the target while avoiding walls."""
-        if not self.path or (self.target and self.path[-1] != self.target):
-            self.find_path()  # Recalculate path if needed
+    def move_towards_target(self, flow_field=None, replan=True):
+        """Finds a path and moves toward the target while avoiding walls.
+
+        With a shared flow field the next tile is a lookup; otherwise the
+        enemy runs its own A* search, unless replan is False because a
+        scheduler plans for it.
+        """
+        self.prev_x, self.prev_y = self.x, self.y
+        if flow_field is not None:
+            if not self.path:
+                next_tile = flow_field.get_next_step(
+                    (self.x // GAME_RULES["TILE_SIZE"], self.y // GAME_RULES["TILE_SIZE"]))
+                if next_tile:
+                    self.path = [next_tile]
+        else:
+            self.refine_path()
+            if replan and self.needs_path():
+                self.find_path()  # Recalculate path if needed
 
         self.move_along_path()  # Follow path step by step
 
-    def draw(self, surface, camera_x, camera_y):
-        """Draw the enemy, facing the movement direction."""
-        enemy_x = self.x - camera_x
-        enemy_y = self.y - camera_y
+    def sprite(self, camera_x, camera_y, alpha=1.0):
+        """The enemy's image, facing the movement direction, and where it goes on screen.
+
+        alpha blends between the last two simulation ticks for smooth motion.
+        """
+        enemy_x = self.prev_x + (self.x - self.prev_x) * alpha - camera_x
+        enemy_y = self.prev_y + (self.y - self.prev_y) * alpha - camera_y
 
         # Get next position to face
         if self.path:
@@ -193,61 +270,44 @@ class Enemy:
             angle = math.degrees(math.atan2(dy, dx))
 
             # Rotate the enemy image to face the next tile
-            rotated_image = pygame.transform.rotate(
-                self.enemy_image, -angle - 90)
+            rotated_image = rotated(self.enemy_rotations, -angle - 90)
             rotated_rect = rotated_image.get_rect()
 
             # Position the rotated image correctly (center it on the enemy)
             rotated_rect.center = (
                 enemy_x + GAME_RULES["ENEMY_SIZE"] // 2, enemy_y + GAME_RULES["ENEMY_SIZE"] // 2)
-
-            # Draw the rotated enemy image
-            surface.blit(rotated_image, rotated_rect)
+            return rotated_image, rotated_rect
         else:
             # If no path, just draw the enemy image normally
-            surface.blit(self.enemy_image, (enemy_x, enemy_y))
+            return self.enemy_image, (enemy_x, enemy_y)
 
     def check_attack(self, player):
         """Check if enemy is close enough to attack the player."""
         if abs(self.x - player.x) < GAME_RULES["TILE_SIZE"] and abs(self.y - player.y) < GAME_RULES["TILE_SIZE"]:
-            current_time = time.time()
+            current_time = self.clock.time()
             if current_time - self.last_damage_time >= 1:
                 self.last_damage_time = current_time
                 return True
         return False
 
+    @profiled("is_in_line_of_sight")
     def is_in_line_of_sight(self, player):
         """Check if the player is in the enemy's line of sight."""
-        # Calculate direction towards the player
-        dx = player.x - self.x
-        dy = player.y - self.y
-        angle = math.degrees(math.atan2(dy, dx))
-
-        # Check for obstacles between the enemy and the player (basic version)
-        # Cast a line from enemy to player and check if it's clear of walls
-        step_size = 10  # Step size for checking along the line
-        steps = max(abs(dx), abs(dy)) // step_size
-
-        for i in range(1, steps + 1):
-            # Check along the line from enemy to player
-            check_x = self.x + i * dx / steps
-            check_y = self.y + i * dy / steps
-            col, row = int(
-                check_x // GAME_RULES["TILE_SIZE"]), int(check_y // GAME_RULES["TILE_SIZE"])
-            if self.maze_grid[row][col] == 1:  # Wall detected
-                return False
-
-        return True
+        # Trace between the tiles holding the centers of the enemy and the player
+        enemy_tile = ((self.x + GAME_RULES["ENEMY_SIZE"] // 2) // GAME_RULES["TILE_SIZE"],
+                      (self.y + GAME_RULES["ENEMY_SIZE"] // 2) // GAME_RULES["TILE_SIZE"])
+        player_tile = ((player.x + GAME_RULES["PLAYER_SIZE"] // 2) // GAME_RULES["TILE_SIZE"],
+                       (player.y + GAME_RULES["PLAYER_SIZE"] // 2) // GAME_RULES["TILE_SIZE"])
+        return self.maze.has_line_of_sight(enemy_tile, player_tile)
 
     def respawn(self):
-        """Respawn the enemy at a random valid location in the maze."""
-        while True:
-            x = random.randint(1, MAZE_WIDTH - 2)
-            y = random.randint(1, MAZE_HEIGHT - 2)
-
-            # Ensure the enemy doesn't spawn inside a wall
-            if MAZE[y][x] == 0:  # 0 means walkable space
-                self.x = x * GAME_RULES["TILE_SIZE"]
-                self.y = y * GAME_RULES["TILE_SIZE"]
-                self.health = 3  # Reset health
-                break  # Found a valid position, exit loop
+        """Respawn the enemy at a random valid location in the maze, e.g. when recycled."""
+        # Ensure the enemy doesn't spawn inside a wall
+        x, y = self.maze.random_walkable_tile()
+        self.x = x * GAME_RULES["TILE_SIZE"]
+        self.y = y * GAME_RULES["TILE_SIZE"]
+        self.prev_x, self.prev_y = self.x, self.y  # Don't slide across the map
+        self.health = 3  # Reset health
+        self.path = []  # The old path starts somewhere else
+        self.waypoints = []
+        self.planner = None
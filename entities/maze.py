@@ -1,24 +1,150 @@
 import pygame
+import random
+from collections import OrderedDict
+import numpy as np
 from constants.maze_variants import MAZE
 from constants.colors import COLORS
 from constants.game_rules import *
+from utils.culling import cell_range
+from utils.line_of_sight import is_line_clear
+
+WALL = 1
+FLOOR = 0
+
+# Forget cached visibility past this many tile pairs to bound memory on big maps
+MAX_VISIBILITY_ENTRIES = 1 << 20
 
 
 class Maze:
-    def __init__(self, width, height):
-        self.width = width
-        self.height = height
-        self.grid = MAZE  # Ensure this matches the grid's dimensions (24x18)
-
-    def draw(self, surface, camera_x, camera_y):
-        """Draws the maze, adjusting for the camera offset."""
-        for row in range(self.height):
-            for col in range(self.width):
-                # Make sure we stay within the grid bounds
-                if 0 <= col < len(self.grid[0]) and 0 <= row < len(self.grid):
-                    tile_x = col * GAME_RULES["TILE_SIZE"] - camera_x
-                    tile_y = row * GAME_RULES["TILE_SIZE"] - camera_y
-                    if 0 <= tile_x < SCREEN_WIDTH and 0 <= tile_y < SCREEN_HEIGHT:  # Only draw visible tiles
-                        color = COLORS["WALL_COLOR"] if self.grid[row][col] == 1 else COLORS["FLOOR_COLOR"]
-                        pygame.draw.rect(
-                            surface, color, (tile_x, tile_y, GAME_RULES["TILE_SIZE"], GAME_RULES["TILE_SIZE"]))
+    def __init__(self, grid=None):
+        """Copy grid (rows of tiles, the stock MAZE by default); it decides the maze dimensions.
+
+        Tiles are kept in one byte per tile, row-major, inside an extra ring of
+        wall so lookups up to one tile outside the map need no bounds checks.
+        """
+        rows = grid if grid is not None else MAZE
+        self.width = len(rows[0])
+        self.height = len(rows)
+        self.stride = self.width + 2  # Bytes per padded row
+
+        self.tiles = bytearray([WALL]) * (self.stride * (self.height + 2))
+        for row, tiles in enumerate(rows):
+            start = self.index(0, row)
+            self.tiles[start:start + self.width] = bytes(tiles)
+        # NumPy view sharing the same memory, for bulk queries
+        self.tile_array = np.frombuffer(self.tiles, dtype=np.uint8).reshape(
+            self.height + 2, self.stride)
+
+        self.version = 0  # Bumped on every tile change so caches can invalidate
+
+        # Pre-rasterized background, one surface per CHUNK_TILES x CHUNK_TILES block
+        self.chunk_tiles = GAME_RULES["MAZE_CHUNK_TILES"]
+        self.chunks = OrderedDict()  # (chunk_col, chunk_row) -> surface, least recently drawn first
+        self.dirty_chunks = set()
+        self.chunk_limit = 0  # Most chunks kept: the largest view so far plus a ring around it
+
+        self.visibility = {}  # (from tile, to tile) -> line of sight is clear
+
+    def index(self, col, row):
+        """Position of a tile in self.tiles; valid from -1 to width/height inclusive."""
+        return (row + 1) * self.stride + col + 1
+
+    def is_wall(self, col, row):
+        return self.tiles[(row + 1) * self.stride + col + 1] == WALL
+
+    def is_walkable(self, col, row):
+        return self.tiles[(row + 1) * self.stride + col + 1] == FLOOR
+
+    def walls_at(self, cols, rows):
+        """Boolean array telling which of the (cols[i], rows[i]) tiles are walls."""
+        return self.tile_array[rows + 1, cols + 1] == WALL
+
+    def random_walkable_tile(self):
+        """Pick a random tile that isn't a wall, away from the outer border."""
+        while True:
+            col = random.randint(1, self.width - 2)
+            row = random.randint(1, self.height - 2)
+            if self.is_walkable(col, row):
+                return col, row
+
+    def set_tile(self, col, row, value):
+        """Change a tile and mark the chunk containing it for re-rasterizing."""
+        self.tiles[self.index(col, row)] = value
+        self.version += 1
+        self.visibility.clear()
+        self.dirty_chunks.add(
+            (col // self.chunk_tiles, row // self.chunk_tiles))
+
+    def has_line_of_sight(self, from_tile, to_tile):
+        """Whether the straight line between two tile centers is free of walls.
+
+        Results are memoized per tile pair until the maze changes.
+        """
+        key = (from_tile, to_tile)
+        visible = self.visibility.get(key)
+        if visible is None:
+            if len(self.visibility) >= MAX_VISIBILITY_ENTRIES:
+                self.visibility.clear()
+            visible = is_line_clear(self, from_tile, to_tile)
+            self.visibility[key] = visible
+        return visible
+
+    def build_chunk(self, chunk_col, chunk_row):
+        """Rasterize one chunk of tiles into its own surface."""
+        tile_size = GAME_RULES["TILE_SIZE"]
+        first_col = chunk_col * self.chunk_tiles
+        first_row = chunk_row * self.chunk_tiles
+        cols = min(self.chunk_tiles, self.width - first_col)
+        rows = min(self.chunk_tiles, self.height - first_row)
+
+        chunk = pygame.Surface((cols * tile_size, rows * tile_size))
+        if pygame.display.get_surface() is not None:
+            chunk = chunk.convert()  # Match the display format for fast blits
+
+        chunk.fill(COLORS["FLOOR_COLOR"])
+        for row in range(rows):
+            for col in range(cols):
+                if self.is_wall(first_col + col, first_row + row):
+                    pygame.draw.rect(chunk, COLORS["WALL_COLOR"],
+                                     (col * tile_size, row * tile_size, tile_size, tile_size))
+        return chunk
+
+    def sprites(self, camera_x, camera_y, view):
+        """(chunk surface, screen position) of every chunk that overlaps view, the visible world rectangle.
+
+        Only those chunks are drawn, so the cost depends on the screen size
+        rather than the size of the maze. The cache keeps the visible chunks
+        and one ring around them; chunks unused for longest are dropped.
+        """
+        chunk_size = self.chunk_tiles * GAME_RULES["TILE_SIZE"]
+        first_col, first_row, last_col, last_row = cell_range(
+            view, chunk_size, -(-self.width // self.chunk_tiles), -(-self.height // self.chunk_tiles))
+        self.chunk_limit = max(self.chunk_limit,
+                               (last_col - first_col + 3) * (last_row - first_row + 3))
+
+        draws = []
+        for chunk_row in range(first_row, last_row + 1):
+            for chunk_col in range(first_col, last_col + 1):
+                key = (chunk_col, chunk_row)
+                chunk = self.chunks.get(key)
+                if chunk is None or key in self.dirty_chunks:
+                    chunk = self.build_chunk(chunk_col, chunk_row)
+                    self.chunks[key] = chunk
+                    self.dirty_chunks.discard(key)
+                self.chunks.move_to_end(key)
+                draws.append((chunk, (chunk_col * chunk_size - camera_x,
+                                      chunk_row * chunk_size - camera_y)))
+
+        while len(self.chunks) > self.chunk_limit:
+            key, _ = self.chunks.popitem(last=False)
+            self.dirty_chunks.discard(key)  # Rebuilt from the tiles anyway when next seen
+        return draws
+
+    def draw(self, surface, camera_x, camera_y, view=None):
+        """Draws the maze, adjusting for the camera offset.
+
+        view defaults to the surface seen from the camera.
+        """
+        if view is None:
+            view = pygame.Rect(int(camera_x), int(camera_y), *surface.get_size())
+        surface.blits(self.sprites(camera_x, camera_y, view), doreturn=False)
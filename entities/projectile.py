@@ -1,93 +1,211 @@
-import pygame
 import math
+import numpy as np
 from constants.game_rules import GAME_RULES
-from constants.file_paths import IMAGES_FOLDER
-from constants.maze_variants import MAZE_WIDTH, MAZE_HEIGHT
-from utils.sound_manager import sound_manager
-
-
-class Projectile:
-    def __init__(self, start_x, start_y, target_x, target_y, player_projectile, projectile_type):
-        # Spawn projectile from the center of the player
-
-        # Load projectile image
-        self.projectile_image = pygame.image.load(
-            f"{IMAGES_FOLDER}/{projectile_type}")
-        self.projectile_image = pygame.transform.smoothscale(
-            self.projectile_image, (GAME_RULES["PROJECTILE_SIZE"], GAME_RULES["PROJECTILE_SIZE"]))
-
-        self.x = start_x + GAME_RULES["PLAYER_SIZE"] // 2
-        self.y = start_y + GAME_RULES["PLAYER_SIZE"] // 2
+from utils.asset_manager import asset_manager, rotated
+from utils.spatial_hash import SpatialHash
+
+
+class ProjectilePool:
+    """All live projectiles, stored as parallel NumPy arrays.
+
+    Live projectiles are packed into the first `count` slots. Movement and wall
+    tests run as one vectorized step over every projectile, and dead entries are
+    removed by swapping the last live projectile into their slot.
+
+    Slots are preallocated, so firing never creates an object. The arrays
+    double when full but never past high_water slots; shots beyond that are
+    dropped.
+    """
+
+    def __init__(self, capacity=None, high_water=None):
+        capacity = capacity or GAME_RULES["PROJECTILE_POOL_CAPACITY"]
+        self.high_water = high_water or GAME_RULES["PROJECTILE_POOL_HIGH_WATER"]
+        self.count = 0
+        self.acquired = 0  # Each one a Projectile object that never had to be allocated
+        self.grows = 0
+        self.dropped = 0
+        self.peak = 0
         self.speed = 10  # Speed of the projectile
-
-        self.player_projectile = player_projectile
-        self.hit = False
-
-        # Calculate the direction from player to crosshair (target)
-        dx = target_x - self.x
-        dy = target_y - self.y
-
-        # Calculate the distance between start and target
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)  # Position at the start of the tick
+        self.prev_y = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.player_projectile = np.zeros(capacity, dtype=bool)  # Owner
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.angle = np.zeros(capacity)
+        self.image_index = np.zeros(capacity, dtype=np.int32)
+
+        self.image_names = []  # image_index -> projectile image file name
+        self.image_rotations = []  # image_index -> pre-rotated surfaces
+
+        # Broadphase over the entities being hit, rebuilt for every collision pass
+        self.spatial_hash = SpatialHash(GAME_RULES["COLLISION_CELL_SIZE"])
+        self.ticks = 0
+        self.narrow_phase_tests = 0  # Projectile-entity pairs tested since the last move()
+        self.total_narrow_phase_tests = 0
+
+    def __len__(self):
+        return self.count
+
+    def grow(self):
+        """Double the capacity of every array, up to the high-water mark."""
+        size = min(len(self.x) * 2, self.high_water)
+        for name in ("x", "y", "prev_x", "prev_y", "dx", "dy", "player_projectile", "alive", "angle", "image_index"):
+            array = getattr(self, name)
+            grown = np.zeros(size, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+        self.grows += 1
+
+    def get_image_index(self, projectile_type):
+        if projectile_type not in self.image_names:
+            self.image_names.append(projectile_type)
+            # Shared pre-rotated projectile images, decoded once for all projectiles
+            self.image_rotations.append(asset_manager.get_rotations(
+                projectile_type, (GAME_RULES["PROJECTILE_SIZE"], GAME_RULES["PROJECTILE_SIZE"])))
+        return self.image_names.index(projectile_type)
+
+    def acquire(self, start_x, start_y, target_x, target_y, player_projectile, projectile_type):
+        """Take a free slot for a projectile fired from start towards target."""
+        # Spawn projectile from the center of the shooter
+        x = start_x + GAME_RULES["PLAYER_SIZE"] // 2
+        y = start_y + GAME_RULES["PLAYER_SIZE"] // 2
+
+        # Calculate the direction from shooter to target
+        dx = target_x - x
+        dy = target_y - y
         distance = math.sqrt(dx**2 + dy**2)
-
+        if distance == 0:
+            return  # No direction to fly in
+
+        if self.count == len(self.x):
+            if self.count >= self.high_water:
+                self.dropped += 1
+                return
+            self.grow()
+
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
         # Normalize direction and set the speed of the projectile
-        self.dx = (dx / distance) * self.speed
-        self.dy = (dy / distance) * self.speed
-
-        # Calculate angle for rotating the projectile image
-        self.angle = math.degrees(math.atan2(dy, dx))  # Angle in degrees
-        self.angle -= 90  # Offset to align the image
+        self.dx[i] = (dx / distance) * self.speed
+        self.dy[i] = (dy / distance) * self.speed
+        self.player_projectile[i] = player_projectile
+        self.alive[i] = True
+        # Angle for rotating the projectile image, offset to align the image
+        self.angle[i] = math.degrees(math.atan2(dy, dx)) - 90
+        self.image_index[i] = self.get_image_index(projectile_type)
+        self.count += 1
+        self.acquired += 1
+        self.peak = max(self.peak, self.count)
+
+    def release(self, i):
+        """Free the slot of projectile i by moving the last live projectile into it."""
+        last = self.count - 1
+        if i != last:
+            for array in (self.x, self.y, self.prev_x, self.prev_y, self.dx, self.dy,
+                          self.player_projectile, self.alive, self.angle, self.image_index):
+                array[i] = array[last]
+        self.alive[last] = False
+        self.count = last
+
+    def remove_dead(self):
+        """Compact the pool, dropping every projectile no longer marked alive."""
+        # Descending order so swapped-in projectiles have already been checked
+        for i in np.flatnonzero(~self.alive[:self.count])[::-1]:
+            self.release(i)
+
+    def stats(self):
+        return {
+            "allocations_avoided": self.acquired,
+            "capacity": len(self.x),
+            "grows": self.grows,
+            "dropped": self.dropped,
+            "in_use": self.count,
+            "peak_in_use": self.peak,
+            "narrow_phase_tests": self.narrow_phase_tests,  # Last tick
+            "narrow_phase_tests_per_tick": self.total_narrow_phase_tests / self.ticks if self.ticks else 0
+        }
 
     def move(self, maze):
-        """Move the projectile along the calculated path, stopping if it hits a wall."""
-        new_x = self.x + self.dx
-        new_y = self.y + self.dy
-
-        # Check if the projectile can move to the new position
-        if self.can_move(new_x, new_y, maze):
-            self.x = new_x
-            self.y = new_y
-        else:
-            # Stop moving by setting speed to zero
-            self.dx = 0
-            self.dy = 0
-
-    def can_move(self, x, y, maze):
-        """Check if the projectile can move without hitting a wall."""
-        col, row = int(x // GAME_RULES["TILE_SIZE"]
-                       ), int(y // GAME_RULES["TILE_SIZE"])
-
-        # If outside the bounds of the maze or inside a wall, return False
-        if row < 0 or row >= MAZE_HEIGHT or col < 0 or col >= MAZE_WIDTH or maze.grid[row][col] == 1:
-            self.hit = True
-            return False  # Collision detected
-
-        return True  # No collision
-
-    def check_collision(self, enemy):
-        """Check if the projectile collides with an enemy, considering enemy size."""
-        # Calculate the enemy's center point and a reasonable collision radius
-        enemy_center_x = enemy.x + GAME_RULES["ENEMY_SIZE"] // 2
-        enemy_center_y = enemy.y + GAME_RULES["ENEMY_SIZE"] // 2
-        # You can tweak this value for more or less sensitivity
+        """Move every projectile one step, killing those that would enter a wall.
+
+        Returns the number of projectiles that hit a wall.
+        """
+        n = self.count
+        new_x = self.x[:n] + self.dx[:n]
+        new_y = self.y[:n] + self.dy[:n]
+        cols = np.floor_divide(new_x, GAME_RULES["TILE_SIZE"]).astype(np.intp)
+        rows = np.floor_divide(new_y, GAME_RULES["TILE_SIZE"]).astype(np.intp)
+
+        # A step is shorter than a tile, so the maze's wall border catches leaving the map
+        hit = maze.walls_at(cols, rows)
+
+        moving = ~hit
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self.x[:n][moving] = new_x[moving]
+        self.y[:n][moving] = new_y[moving]
+        self.alive[:n] &= moving
+        self.ticks += 1
+        self.narrow_phase_tests = 0
+        return int(np.count_nonzero(hit))
+
+    def hits_by_entity(self, entities, player_projectile):
+        """Live projectiles from the given side that overlap each entity.
+
+        Returns (entity index, sorted projectile indices) pairs in entity
+        order, only for entities with candidates. The entities are bucketed
+        into the spatial hash and every projectile is matched against the
+        cells around it in one vectorized pass, so the cost doesn't grow
+        with a NumPy call per entity.
+        """
+        n = self.count
+        shots = np.flatnonzero(self.alive[:n] & (self.player_projectile[:n] == player_projectile))
+        if len(shots) == 0 or not entities:
+            return []
+
+        # Entity center points and a reasonable collision radius
+        centers_x = np.fromiter((entity.x for entity in entities), float, len(entities)) \
+            + GAME_RULES["ENEMY_SIZE"] // 2
+        centers_y = np.fromiter((entity.y for entity in entities), float, len(entities)) \
+            + GAME_RULES["ENEMY_SIZE"] // 2
         collision_radius = GAME_RULES["TILE_SIZE"] // 2
 
-        # Calculate the distance between the projectile and the enemy center
-        dist_x = abs(self.x - enemy_center_x)
-        dist_y = abs(self.y - enemy_center_y)
-
-        # Check if within collision radius
-        if dist_x < collision_radius and dist_y < collision_radius:
-            return True
-
-        return False
-
-    def draw(self, surface, camera_x, camera_y):
-        """Draw the projectile with proper rotation based on movement."""
-        rotated_image = pygame.transform.rotate(
-            self.projectile_image, -self.angle)  # Rotate counter-clockwise
-        new_rect = rotated_image.get_rect(
-            center=(self.x - camera_x, self.y - camera_y))
-
-        # Draw the rotated image
-        surface.blit(rotated_image, new_rect.topleft)
+        self.spatial_hash.rebuild(centers_x, centers_y)
+        pairs, targets = self.spatial_hash.query_pairs(self.x[shots], self.y[shots])
+        self.narrow_phase_tests += len(pairs)
+        self.total_narrow_phase_tests += len(pairs)
+        shots = shots[pairs]
+        near = (np.abs(self.x[shots] - centers_x[targets]) < collision_radius) & (
+            np.abs(self.y[shots] - centers_y[targets]) < collision_radius)
+        shots, targets = shots[near], targets[near]
+        if len(shots) == 0:
+            return []
+
+        # Group by entity, projectiles in index order within each group
+        order = np.lexsort((shots, targets))
+        shots, targets = shots[order], targets[order]
+        bounds = np.flatnonzero(np.diff(targets)) + 1
+        return [(int(group_targets[0]), group_shots) for group_targets, group_shots
+                in zip(np.split(targets, bounds), np.split(shots, bounds))]
+
+    def sprites(self, camera_x, camera_y, alpha=1.0, indices=None):
+        """(image, screen position) of the projectiles at indices (all by default), rotated to their heading.
+
+        alpha blends between the last two simulation ticks for smooth motion.
+        """
+        if indices is None:
+            indices = np.arange(self.count)
+        xs = self.prev_x[indices] + (self.x[indices] - self.prev_x[indices]) * alpha - camera_x
+        ys = self.prev_y[indices] + (self.y[indices] - self.prev_y[indices]) * alpha - camera_y
+        draws = []
+        for i, x, y in zip(indices, xs, ys):
+            rotated_image = rotated(
+                self.image_rotations[self.image_index[i]], -self.angle[i])  # Rotate counter-clockwise
+            new_rect = rotated_image.get_rect(center=(x, y))
+            draws.append((rotated_image, new_rect.topleft))
+
+        return draws
@@ -0,0 +1,166 @@
+"""Run the game simulation without a window or sound, as fast as the CPU allows.
+
+Usage: python headless.py --ticks 10000 --agent scripted --seed 1
+"""
+import os
+
+# Must be set before the game modules initialize pygame
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+# Leave SIGINT/SIGTERM alone, so batch workers can still be stopped
+os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1"
+
+import argparse
+import random
+import time
+import pygame
+
+from constants.game_rules import GAME_RULES
+from main import new_game, run_tick, get_camera
+from utils.profiler import profiler
+from utils.replay import MOVE_KEYS, TickInput, pack_buttons
+from utils.sound_manager import sound_manager
+
+
+def nearest_enemy(player, enemies):
+    """The closest enemy to the player, or None if there are none."""
+    return min(enemies, key=lambda enemy: abs(enemy.x - player.x) + abs(enemy.y - player.y),
+               default=None)
+
+
+class RandomAgent:
+    """Wanders in random directions and sprays shots at random points."""
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.keys = 0
+
+    def act(self, player, enemies, tick):
+        """Return (key bits, world aim position, mouse button held) for this tick."""
+        if tick % 30 == 0:
+            self.keys = sum(
+                1 << bit for bit in range(len(MOVE_KEYS)) if self.random.random() < 0.3)
+        aim = (player.x + self.random.randint(-500, 500),
+               player.y + self.random.randint(-500, 500))
+        return self.keys, aim, self.random.random() < 0.5
+
+
+class ScriptedAgent:
+    """Walks a fixed loop of directions and shoots at the nearest enemy."""
+
+    PATTERN = [(pygame.K_d, 90), (pygame.K_s, 60), (pygame.K_a, 90), (pygame.K_w, 60)]
+
+    def __init__(self, seed):
+        self.steps = [1 << MOVE_KEYS.index(key)
+                      for key, ticks in self.PATTERN for _ in range(ticks)]
+
+    def act(self, player, enemies, tick):
+        """Return (key bits, world aim position, mouse button held) for this tick."""
+        target = nearest_enemy(player, enemies)
+        if target is None:
+            # Aim at the player's own center, which fires nothing
+            aim = (player.x + GAME_RULES["PLAYER_SIZE"] // 2, player.y + GAME_RULES["PLAYER_SIZE"] // 2)
+        else:
+            aim = (target.x, target.y)
+        # Click on and off so the plasma gun keeps firing as well
+        return self.steps[tick % len(self.steps)], aim, tick % 20 < 10
+
+
+AGENTS = {"random": RandomAgent, "scripted": ScriptedAgent}
+
+
+def agent_input(agent, tick, player, enemies, was_pressed):
+    """The agent's move this tick as the TickInput a player would have produced."""
+    keys, aim, pressed = agent.act(player, enemies, tick)
+    # The agent aims in world coordinates, the mouse is on screen
+    camera_x, camera_y = get_camera(player)
+    buttons = pack_buttons(pressed, 1 if pressed and not was_pressed else 0)
+    return TickInput(keys, int(aim[0] - camera_x), int(aim[1] - camera_y), buttons), pressed
+
+
+def run_headless(ticks, agent_name="scripted", seed=0):
+    """Simulate ticks game ticks, restarting whenever the player dies.
+
+    Returns a dict with the totals and the simulated ticks per second.
+    """
+    random.seed(seed)  # Spawn positions
+    sound_manager.enabled = False
+    agent = AGENTS[agent_name](seed)
+
+    player, maze, enemies, projectiles, flow_field = new_game()
+    kills, deaths = 0, 0
+    was_pressed = False
+
+    start = time.perf_counter()
+    for tick in range(ticks):
+        profiler.begin_frame()
+        tick_input, was_pressed = agent_input(agent, tick, player, enemies, was_pressed)
+        run_tick(tick_input, player, maze, enemies, projectiles, flow_field)
+
+        if player.health <= 0:
+            kills += player.kill_count
+            deaths += 1
+            player, maze, enemies, projectiles, flow_field = new_game()
+        profiler.end_frame()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "ticks": ticks,
+        "seconds": elapsed,
+        "ticks_per_second": ticks / elapsed if elapsed else float("inf"),
+        "kills": kills + player.kill_count,
+        "deaths": deaths
+    }
+
+
+def run_match(seed, agent_name="scripted", max_ticks=36000):
+    """Play one seeded match until the player dies or max_ticks pass.
+
+    Returns a dict with the ticks survived, kills, whether the player died
+    and the wall-clock seconds it took.
+    """
+    random.seed(seed)  # Spawn positions
+    sound_manager.enabled = False
+    agent = AGENTS[agent_name](seed)
+
+    player, maze, enemies, projectiles, flow_field = new_game()
+    was_pressed = False
+
+    start = time.perf_counter()
+    tick = 0
+    while tick < max_ticks and player.health > 0:
+        profiler.begin_frame()
+        tick_input, was_pressed = agent_input(agent, tick, player, enemies, was_pressed)
+        run_tick(tick_input, player, maze, enemies, projectiles, flow_field)
+        profiler.end_frame()
+        tick += 1
+
+    return {
+        "seed": seed,
+        "ticks": tick,
+        "kills": player.kill_count,
+        "died": player.health <= 0,
+        "seconds": time.perf_counter() - start
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=10000)
+    parser.add_argument("--agent", choices=sorted(AGENTS), default="scripted")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", metavar="PATH",
+                        help="profile every tick and write a Chrome trace to PATH")
+    args = parser.parse_args()
+
+    profiler.enabled = args.trace is not None
+    result = run_headless(args.ticks, args.agent, args.seed)
+    print(f"Simulated {result['ticks']} ticks in {result['seconds']:.2f}s "
+          f"({result['ticks_per_second']:.0f} ticks/s), "
+          f"{result['kills']} kills, {result['deaths']} deaths")
+    if args.trace:
+        profiler.export_trace(args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,76 @@
 import pygame
-from constants.game_rules import GAME_RULES, SCREEN_WIDTH, SCREEN_HEIGHT
+import time
+from constants.game_rules import GAME_RULES
 from constants.file_paths import MUSIC_FOLDER
-from entities.player import Player
+from utils.asset_manager import asset_manager
+from utils.preloader import preload_assets
+from utils.window import window
+
+# Images decoded during startup; the rotated ones also get their rotation tables
+PRELOAD_IMAGES = [
+    ("crosshair.png", (GAME_RULES["TILE_SIZE"], GAME_RULES["TILE_SIZE"]))
+]
+PRELOAD_ROTATED_IMAGES = [
+    ("player.png", (GAME_RULES["PLAYER_SIZE"], GAME_RULES["PLAYER_SIZE"])),
+    ("enemy.png", (GAME_RULES["ENEMY_SIZE"], GAME_RULES["ENEMY_SIZE"])),
+    ("plasma_gun_projectile.png",
+     (GAME_RULES["PROJECTILE_SIZE"], GAME_RULES["PROJECTILE_SIZE"])),
+    ("mini_gun_projectile.png",
+     (GAME_RULES["PROJECTILE_SIZE"], GAME_RULES["PROJECTILE_SIZE"]))
+]
 
 
 def initialize_game():
+    """Open the window and load every asset up front.
+
+    Importing the game modules does no work; this is the one place where
+    pygame starts and assets are decoded. Returns the seconds spent per step.
+    """
+    timings = {}
+    start = time.perf_counter()
+
+    def step_done(name):
+        nonlocal start
+        now = time.perf_counter()
+        timings[name] = now - start
+        start = now
 
     # Initialize pygame
     pygame.init()
+    step_done("pygame_init")
 
+    # Images are converted to the display format, so the window comes first
+    window.get_surface()
     pygame.display.set_caption("MAZE SHOOTER")
-
-    crosshair_image = pygame.image.load("assets/images/crosshair.png")
-    crosshair_image = pygame.transform.smoothscale(
-        crosshair_image, (GAME_RULES["TILE_SIZE"], GAME_RULES["TILE_SIZE"]))
+    step_done("window")
 
     # Set a default system cursor first (for fallback)
-    pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_ARROW)
+    try:
+        pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_ARROW)
+    except pygame.error:
+        pass  # No system cursors, e.g. with the dummy video driver
     pygame.mouse.set_visible(False)  # Hide the default cursor
 
     # Initialize the mixer for sound
 
     pygame.mixer.init()
     pygame.mixer.set_num_channels(48)
+    step_done("mixer")
+
+    # Decode and pre-rotate every sprite and decode every sound once, in parallel,
+    # so no asset work happens inside the game loop
+    preload_assets(PRELOAD_IMAGES, PRELOAD_ROTATED_IMAGES, window.get_surface())
+    step_done("assets")
 
     print("Nr of channels: ", pygame.mixer.get_num_channels())
+    print("Image cache: ", asset_manager.stats())
+    print("Startup: ", ", ".join(
+        f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings.items()))
 
     # Background music
     # Load your soundtrack
     # pygame.mixer.music.load(f"{MUSIC_FOLDER}/soundtrack.mp3")
     # pygame.mixer.music.set_volume(0.3)  # Optional: set the volume (0.0 to 1.0)
     # pygame.mixer.music.play(loops=-1, start=0.0)
+
+    return timings
@@ -1,4 +1,9 @@
+import argparse
+import os
 import pygame
+import random
+import time
+import zlib
 from constants.file_paths import *
 from constants.colors import COLORS
 from constants.game_rules import *
@@ -9,55 +14,89 @@ from entities.maze import Maze
 from init import initialize_game
 from entities.player import Player
 from entities.enemy import Enemy
+from entities.projectile import ProjectilePool
 from utils.sound_manager import sound_manager
+from utils.asset_manager import asset_manager
+from utils.flow_field import FlowField
+from utils.path_scheduler import path_scheduler
+from utils.hpa import pathfinder_for
+from utils.maze_generator import build_grid
+from utils.object_pool import ObjectPool
+from utils.sim_clock import sim_clock
+from utils.profiler import profiler
+from utils.hud import hud
+from utils.dirty_rects import dirty_rects
+from utils.culling import culler
+from utils.render_queue import render_queue
+from utils.window import window
+from utils.replay import KeyBits, MouseButton, Recording, capture_input, unpack_buttons
 
-screen = pygame.display.set_mode(
-    (SCREEN_WIDTH, SCREEN_HEIGHT))
+# Most simulation ticks run in one frame before the game slows down instead
+MAX_CATCH_UP_TICKS = 5
 
-crosshair_image = pygame.image.load("assets/images/crosshair.png")
-crosshair_image = pygame.transform.smoothscale(
-    crosshair_image, (GAME_RULES["TILE_SIZE"], GAME_RULES["TILE_SIZE"]))
+# Written when F4 is pressed; open in chrome://tracing or ui.perfetto.dev
+TRACE_FILE = "profile_trace.json"
 
-# Set the custom crosshair cursor:
-crosshair_width, crosshair_height = crosshair_image.get_size()
+# Shared by every round, so a restart respawns the last round's enemies instead of building new ones
+enemy_pool = ObjectPool(Enemy, high_water=GAME_RULES["ENEMY_POOL_HIGH_WATER"], reset=Enemy.reset)
+
+
+def crosshair_sprite(mouse_pos=None):
+    """The custom crosshair cursor and where it goes, centered on the mouse."""
+    crosshair_image = asset_manager.get_image(
+        "crosshair.png", (GAME_RULES["TILE_SIZE"], GAME_RULES["TILE_SIZE"]))
+    mouse_x, mouse_y = mouse_pos or pygame.mouse.get_pos()
+    return crosshair_image, crosshair_image.get_rect(center=(mouse_x, mouse_y))
+
+
+def draw_crosshair(surface, mouse_pos=None):
+    """Draw the custom crosshair cursor at the mouse and return its rect."""
+    return surface.blit(*crosshair_sprite(mouse_pos))
 
 
 def game_over_screen():
     """Displays the 'You Died' screen with options to restart or exit."""
-    font = pygame.font.Font(None, 100)
-    button_font = pygame.font.Font(None, 50)
-
-    text = font.render("You Died", True, (255, 0, 0))
-    text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3))
+    screen = window.get_surface()
+    screen_width, screen_height = screen.get_size()
+    text = hud.render_text("You Died", 100, (255, 0, 0))
+    text_rect = text.get_rect(center=(screen_width // 2, screen_height // 3))
 
     # Button positions
     play_again_rect = pygame.Rect(
-        SCREEN_WIDTH // 3, SCREEN_HEIGHT // 2, 200, 50)
-    exit_rect = pygame.Rect(SCREEN_WIDTH // 3 * 2 - 100,
-                            SCREEN_HEIGHT // 2, 200, 50)
+        screen_width // 3, screen_height // 2, 200, 50)
+    exit_rect = pygame.Rect(screen_width // 3 * 2 - 100,
+                            screen_height // 2, 200, 50)
 
-    while True:
-        screen.fill(COLORS["GRAY"])  # Clear screen
-        screen.blit(text, text_rect)
+    # Button text
+    play_again_text = hud.render_text("Play Again", 50, (0, 0, 0))
+    exit_text = hud.render_text("Exit Game", 50, (0, 0, 0))
+    play_again_text_rect = play_again_text.get_rect(center=play_again_rect.center)
+    exit_text_rect = exit_text.get_rect(center=exit_rect.center)
+
+    def draw_background(surface):
+        surface.fill(COLORS["GRAY"])  # Clear screen
+        surface.blit(text, text_rect)
 
         # Draw buttons
         # Green Play Again
-        pygame.draw.rect(screen, (0, 255, 0), play_again_rect)
-        pygame.draw.rect(screen, (255, 0, 0), exit_rect)  # Red Exit
+        pygame.draw.rect(surface, (0, 255, 0), play_again_rect)
+        pygame.draw.rect(surface, (255, 0, 0), exit_rect)  # Red Exit
 
         # Draw button text
-        play_again_text = button_font.render("Play Again", True, (0, 0, 0))
-        exit_text = button_font.render("Exit Game", True, (0, 0, 0))
-        screen.blit(play_again_text, play_again_text.get_rect(
-            center=play_again_rect.center))
-        screen.blit(exit_text, exit_text.get_rect(center=exit_rect.center))
+        surface.blit(play_again_text, play_again_text_rect)
+        surface.blit(exit_text, exit_text_rect)
+
+    clock = pygame.time.Clock()
+    while True:
+        clock.tick(GAME_RULES["FPS"])
+
+        # Nothing but the crosshair moves, so most frames redraw only that
+        dirty_rects.begin_frame(screen, "game_over", draw_background)
 
         # Draw custom crosshair cursor
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        screen.blit(crosshair_image, (mouse_x - crosshair_width //
-                    2, mouse_y - crosshair_height // 2))
+        dirty_rects.add(draw_crosshair(screen))
 
-        pygame.display.flip()
+        dirty_rects.end_frame()
 
         # Handle events
         for event in pygame.event.get():
@@ -71,31 +110,49 @@ def game_over_screen():
                     pygame.quit()
 
 
-def handle_user_input(player, camera_x, camera_y, projectiles):
+def handle_user_input(button):
+    """Handle window and debug keys and feed left mouse button events to button.
+
+    Mouse buttons only take effect on the next tick, through run_tick, so a
+    recording of the tick inputs replays exactly.
+    """
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             pygame.quit()
             return  # Ensure the program exits cleanly after quitting
 
-        if event.type == pygame.MOUSEBUTTONDOWN:
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F3:
+                profiler.toggle()
+            elif event.key == pygame.K_F4:
+                profiler.export_trace(TRACE_FILE)
+
+        elif event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:  # Left mouse button
-                if player.weapon == "plasma_gun":
-                    player.fire_projectile(
-                        camera_x, camera_y, projectiles)
-                elif player.weapon == "mini_gun":
-                    player.is_firing = True  # Start firing for mini gun
+                button.press()
 
         elif event.type == pygame.MOUSEBUTTONUP:
             if event.button == 1:  # Left mouse button
-                if player.weapon == "mini_gun":
-                    player.is_firing = False  # Stop firing for mini gun
+                button.release()
 
 
-def update_enemies(enemies, player, projectiles):
-    # Update enemies, check for damage, and fire projectiles
+def update_enemies(enemies, player, projectiles, flow_field):
     for enemy in enemies:
         enemy.set_target(player)
-        enemy.move_towards_target()
+
+    if GAME_RULES["PATHFINDING"] == "flow_field":
+        # One shared pathfinding pass per player tile change, out to the farthest enemy
+        flow_field.update((player.x // GAME_RULES["TILE_SIZE"], player.y // GAME_RULES["TILE_SIZE"]),
+                          [(enemy.x // GAME_RULES["TILE_SIZE"], enemy.y // GAME_RULES["TILE_SIZE"])
+                           for enemy in enemies])
+    else:
+        # A* or HPA* for as many enemies as the per-tick budget allows
+        path_scheduler.run(enemies)
+        flow_field = None
+
+    # Update enemies, check for damage, and fire projectiles
+    for enemy in enemies:
+        enemy.move_towards_target(flow_field, replan=False)
         enemy.fire_projectile(player, projectiles)
 
         # Check for collision with player
@@ -105,107 +162,252 @@ def update_enemies(enemies, player, projectiles):
 
 
 def update_projectiles(projectiles, maze, player, enemies):
-
-    for projectile in projectiles[:]:
-        projectile.move(maze)
-        if projectile.hit:
+    # Move every projectile at once; those that hit a wall are marked dead
+    for _ in range(projectiles.move(maze)):
+        sound_manager.play("projectile_impact")
+
+    # Check for collisions with enemies, all candidates found in one pass
+    for i, hits in projectiles.hits_by_entity(enemies, player_projectile=True):
+        hits = hits[projectiles.alive[hits]]  # Not already spent on an earlier enemy
+        if len(hits) == 0:
+            continue
+        enemy = enemies[i]
+
+        # One damage per projectile; any left over fly on once the enemy dies
+        hits = hits[:enemy.health]
+        projectiles.alive[hits] = False
+        enemy.health -= len(hits)
+        for _ in hits:
+            sound_manager.play("projectile_impact")
+        if enemy.health <= 0:
+            sound_manager.play("explode")
+            enemy.respawn()
+            player.kill_count += 1
+
+    for _, hits in projectiles.hits_by_entity([player], player_projectile=False):
+        player.health -= len(hits)
+        projectiles.alive[hits] = False
+        for _ in hits:
             sound_manager.play("projectile_impact")
-            projectiles.remove(projectile)
-
-        # Check for collisions with enemies
-        for enemy in enemies:
-            if projectile.check_collision(enemy) and projectile.player_projectile:
-                enemy.health -= 1
-                if projectile in projectiles:
-                    projectiles.remove(projectile)
-                    sound_manager.play("projectile_impact")
-                if enemy.health <= 0:
-                    sound_manager.play("explode")
-                    enemy.respawn()
-                    player.kill_count += 1
-        if projectile.check_collision(player) and not projectile.player_projectile:
-            player.health -= 1
-            if projectile in projectiles:
-                sound_manager.play("projectile_impact")
-                projectiles.remove(projectile)
-
-
-def render(maze, player, enemies, projectiles, camera_x, camera_y):
-    # Draw everything
-    screen.fill(COLORS["DARK_SLATE"])
-    maze.draw(screen, camera_x, camera_y)
-    player.draw(screen, camera_x, camera_y)
-    player.draw_health(screen)
-
-    for projectile in projectiles:
-        projectile.draw(screen, camera_x, camera_y)
 
-    for enemy in enemies:
-        enemy.draw(screen, camera_x, camera_y)
+    projectiles.remove_dead()
 
-    # Draw kill counter in top right
-    font = pygame.font.Font(None, 40)
-    kill_text = font.render(
-        f"Kills: {player.kill_count}", True, (255, 255, 255))
-    screen.blit(kill_text, (SCREEN_WIDTH - 150, 20))
 
-    # Draw custom crosshair cursor
-    mouse_x, mouse_y = pygame.mouse.get_pos()
-    screen.blit(crosshair_image, (mouse_x - crosshair_width //
-                2, mouse_y - crosshair_height // 2))
+def render(maze, player, enemies, projectiles, camera_x, camera_y, alpha=1.0, mouse_pos=None):
+    # Draw everything, alpha of the way from the previous tick to the current one;
+    # mouse_pos overrides the real mouse, e.g. for replays
+    screen = window.get_surface()
+
+    # Decide what the camera can see once, then draw only that
+    with profiler.phase("cull"):
+        culler.begin_frame(camera_x, camera_y, screen.get_size())
+        visible_enemies = culler.enemies(enemies)
+        visible_projectiles = culler.projectiles(projectiles)
+
+    def draw_background(surface):
+        surface.fill(COLORS["DARK_SLATE"])
+        with profiler.phase("maze_draw"):
+            render_queue.submit_all("floor", maze.sprites(camera_x, camera_y, culler.view))
+            render_queue.flush(surface)
 
-    pygame.display.flip()
+    # The background only changes when the camera scrolls or the maze is edited
+    dirty_rects.begin_frame(screen, (id(maze), maze.version, camera_x, camera_y),
+                            draw_background)
 
+    # Queue the sprites; the queue draws them layer by layer
+    render_queue.submit_all("projectiles", projectiles.sprites(
+        camera_x, camera_y, alpha, visible_projectiles))
+    for enemy in visible_enemies:
+        render_queue.submit("enemies", *enemy.sprite(camera_x, camera_y, alpha))
+    render_queue.submit("player", *player.sprite(camera_x, camera_y, alpha, mouse_pos))
 
-def main():
+    # Health bar and kill counter, redrawn only when they change
+    render_queue.submit("hud", *hud.sprite(screen.get_width(), player))
+
+    # Draw custom crosshair cursor
+    render_queue.submit("crosshair", *crosshair_sprite(mouse_pos))
+
+    with profiler.phase("blit"):
+        dirty_rects.add_all(render_queue.flush(screen))
+
+    dirty_rects.add(profiler.draw_overlay(screen))
+
+    with profiler.phase("flip"):
+        dirty_rects.end_frame()
+
+
+def new_game(grid=None):
+    """Create the entities for a fresh round, on grid or the map chosen in GAME_RULES."""
+    sim_clock.reset()
+    if grid is None:
+        width, height = GAME_RULES["GENERATED_MAZE_SIZE"]
+        # Seeded from the global generator so seeded runs get the same map
+        grid = build_grid(GAME_RULES["MAZE_VARIANT"], width, height,
+                          random.getrandbits(32))
+    maze = Maze(grid)
+    player = Player(maze)
+    enemy_pool.release_all()  # The last round is over
+    enemies = [enemy_pool.acquire(maze) for _ in range(GAME_RULES["ENEMY_COUNT"])]
+    flow_field = FlowField(maze)
+    if GAME_RULES["PATHFINDING"] == "hpa":
+        pathfinder_for(maze)  # Find the cluster entrances now rather than in the first tick
+    projectiles = ProjectilePool()  # Stores active projectiles
+    return player, maze, enemies, projectiles, flow_field
+
+
+def update_world(keys, player, maze, enemies, projectiles, flow_field):
+    """Advance the simulation by one tick, after input has been handled."""
+    # Move the player
+    with profiler.phase("update_player"):
+        player.move(keys, maze)
+
+    with profiler.phase("update_enemies"):
+        update_enemies(enemies, player, projectiles, flow_field)
+
+    with profiler.phase("update_projectiles"):
+        update_projectiles(projectiles, maze, player, enemies)
+
+    sim_clock.advance()
+
+
+def run_tick(tick_input, player, maze, enemies, projectiles, flow_field):
+    """Apply one tick of recorded or live input, then advance the world."""
+    # Aim with the mouse relative to where the camera is this tick
+    camera_x, camera_y = get_camera(player)
+    mouse_pos = (tick_input.mouse_x, tick_input.mouse_y)
+
+    held, presses = unpack_buttons(tick_input.buttons)
+    if presses:
+        if player.weapon == "plasma_gun":
+            for _ in range(presses):  # One shot per click
+                player.fire_projectile(camera_x, camera_y, projectiles, mouse_pos)
+        elif player.weapon == "mini_gun":
+            player.is_firing = True  # Start firing for mini gun
+    if not held:
+        player.is_firing = False  # Stop firing for mini gun
+
+    # Update weapon if kill count is greater than 0
+    if player.kill_count > 0:
+        player.weapon = "mini_gun"
+
+    # Handle continuous firing for mini gun
+    if player.weapon == "mini_gun" and player.is_firing:
+        player.fire_projectile(camera_x, camera_y, projectiles, mouse_pos)
+
+    update_world(KeyBits(tick_input.keys), player, maze, enemies,
+                 projectiles, flow_field)
+
+
+def world_checksum(player, enemies, projectiles):
+    """Fingerprint of the simulation state, to check that a replay matches its recording."""
+    state = (player.x, player.y, player.health, player.kill_count,
+             [(enemy.x, enemy.y, enemy.health) for enemy in enemies],
+             projectiles.x[:projectiles.count].tobytes(),
+             projectiles.y[:projectiles.count].tobytes())
+    return zlib.crc32(repr(state).encode())
+
+
+def get_camera(player, alpha=1.0):
+    """Camera position that keeps the (interpolated) player centered on screen."""
+    player_x, player_y = player.get_draw_position(alpha)
+    screen_width, screen_height = window.get_size()
+    camera_x = player_x - screen_width // 2 + GAME_RULES["TILE_SIZE"] // 2
+    camera_y = player_y - screen_height // 2 + GAME_RULES["TILE_SIZE"] // 2
+    return camera_x, camera_y
+
+
+def print_stats(projectiles, checksum):
+    """Print the caches', pools' and subsystems' counters for the round just played."""
+    print("Image cache: ", asset_manager.stats())
+    print("Projectile pool: ", projectiles.stats())
+    print("Enemy pool: ", enemy_pool.stats())
+    print("Path scheduler: ", path_scheduler.stats())
+    print("Culling: ", culler.stats())
+    print("Render queue: ", render_queue.stats())
+    print("Sound: ", sound_manager.stats())
+    print("Final state checksum: ", checksum)
+
+
+def main(record_dir=None, show_stats=False):
+    """Run the game; with record_dir, each round's input is saved there for replay.py.
+
+    show_stats prints the subsystem counters at the end of every round.
+    """
     initialize_game()
+    if record_dir is not None:
+        os.makedirs(record_dir, exist_ok=True)
 
+    round_number = 0
     while True:  # Game loop to allow restarting
         clock = pygame.time.Clock()
 
-        player = Player()
-        maze = Maze(MAZE_WIDTH, MAZE_HEIGHT)
-        enemies = [Enemy(maze) for _ in range(GAME_RULES["ENEMY_COUNT"])]
-        projectiles = []  # List to store active projectiles
+        # Seed every round so its recording can rebuild the same spawns
+        round_number += 1
+        recording = Recording(random.getrandbits(32), GAME_RULES["TICK_RATE"], window.get_size())
+        random.seed(recording.seed)
+        player, maze, enemies, projectiles, flow_field = new_game()
+        button = MouseButton()  # Mouse button events waiting for the next tick
 
         camera_x, camera_y = 0, 0  # Camera position
+        tick_seconds = 1 / GAME_RULES["TICK_RATE"]
+        accumulator = 0.0  # Real time not yet simulated
+        previous_time = time.perf_counter()
         running = True
         while running:
-            clock.tick(GAME_RULES["FPS"])
+            with profiler.phase("wait"):
+                clock.tick(GAME_RULES["FPS"])
+            profiler.begin_frame()
+
+            # Never try to catch up more than a few ticks after a stall
+            now = time.perf_counter()
+            accumulator += min(now - previous_time, MAX_CATCH_UP_TICKS * tick_seconds)
+            previous_time = now
 
-            # Update weapon if kill count is greater than 0
-            if player.kill_count > 0:
-                player.weapon = "mini_gun"
+            with profiler.phase("input"):
+                handle_user_input(button)
 
-            handle_user_input(player, camera_x, camera_y, projectiles)
+            # Run as many fixed ticks as the elapsed time calls for
+            while accumulator >= tick_seconds and running:
+                accumulator -= tick_seconds
 
-            # Handle continuous firing for mini gun
-            if player.weapon == "mini_gun" and player.is_firing:
-                player.fire_projectile(camera_x, camera_y, projectiles)
+                tick_input = capture_input(button.take())
+                recording.append(tick_input)
+                run_tick(tick_input, player, maze, enemies,
+                         projectiles, flow_field)
 
-            # Move the player
-            keys = pygame.key.get_pressed()
-            player.move(keys, maze)
+                # Check for game over
+                if player.health <= 0:
+                    running = False
 
-            update_enemies(enemies, player, projectiles)
+            # Start this frame's sounds, identical ones merged into one voice
+            sound_manager.update()
 
-            update_projectiles(projectiles, maze, player, enemies)
+            # Draw between the last two ticks so motion stays smooth at any frame rate
+            alpha = accumulator / tick_seconds
+            camera_x, camera_y = get_camera(player, alpha)
 
-            # Update the camera
-            camera_x = player.x - SCREEN_WIDTH // 2 + \
-                GAME_RULES["TILE_SIZE"] // 2
-            camera_y = player.y - SCREEN_HEIGHT // 2 + \
-                GAME_RULES["TILE_SIZE"] // 2
+            with profiler.phase("render"):
+                render(maze, player, enemies, projectiles, camera_x, camera_y, alpha)
+            profiler.end_frame()
 
-            render(maze, player, enemies, projectiles, camera_x, camera_y)
+        recording.checksum = world_checksum(player, enemies, projectiles)
+        if show_stats:
+            print_stats(projectiles, recording.checksum)
 
-            # Check for game over
-            if player.health <= 0:
-                running = False
+        if record_dir is not None:
+            path = os.path.join(record_dir, f"round_{round_number}.replay")
+            recording.save(path)
+            print(f"Saved {len(recording.ticks)} ticks of input to {path}")
 
         # Show game over screen and restart if needed
         game_over_screen()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Maze shooter")
+    parser.add_argument("--record", metavar="DIR",
+                        help="save each round's input to DIR for replay.py")
+    parser.add_argument("--stats", action="store_true",
+                        help="print cache, pool and subsystem counters after each round")
+    args = parser.parse_args()
+    main(args.record, args.stats)
@@ -0,0 +1,134 @@
+"""Replay a recorded round: at full speed without a window, or in real time with rendering.
+
+Usage:
+    python main.py --record recordings
+    python replay.py recordings/round_1.replay
+    python replay.py recordings/round_1.replay --realtime
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from constants.game_rules import GAME_RULES
+from utils.profiler import profiler
+from utils.replay import Recording
+from utils.sound_manager import sound_manager
+from utils.window import window
+
+
+def replay_headless(recording):
+    """Re-run the recorded ticks as fast as possible and return the outcome."""
+    from main import new_game, run_tick, world_checksum
+
+    sound_manager.enabled = False
+    window.set_size(recording.screen_size)  # Mouse positions are relative to it
+    random.seed(recording.seed)
+    player, maze, enemies, projectiles, flow_field = new_game()
+
+    ticks = 0
+    start = time.perf_counter()
+    for tick_input in recording.ticks:
+        profiler.begin_frame()
+        run_tick(tick_input, player, maze, enemies, projectiles, flow_field)
+        profiler.end_frame()
+        ticks += 1
+        if player.health <= 0:
+            break
+    elapsed = time.perf_counter() - start
+
+    return {
+        "ticks": ticks,
+        "seconds": elapsed,
+        "ticks_per_second": ticks / elapsed if elapsed else float("inf"),
+        "kills": player.kill_count,
+        "health": player.health,
+        "checksum": world_checksum(player, enemies, projectiles)
+    }
+
+
+def replay_realtime(recording):
+    """Show the recorded round in a window, one tick per 1 / TICK_RATE seconds.
+
+    Returns the ticks shown and the final state checksum, or None as the
+    checksum if the window was closed first.
+    """
+    import pygame
+    from init import initialize_game
+    from main import new_game, run_tick, render, get_camera, world_checksum
+
+    window.set_size(recording.screen_size)  # Opened at the recorded size
+    initialize_game()
+    random.seed(recording.seed)
+    player, maze, enemies, projectiles, flow_field = new_game()
+
+    clock = pygame.time.Clock()
+    ticks = 0
+    for tick_input in recording.ticks:
+        clock.tick(recording.tick_rate)
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            pygame.quit()
+            return ticks, None
+
+        run_tick(tick_input, player, maze, enemies, projectiles, flow_field)
+        ticks += 1
+        sound_manager.update()
+
+        camera_x, camera_y = get_camera(player)
+        render(maze, player, enemies, projectiles, camera_x, camera_y,
+               mouse_pos=(tick_input.mouse_x, tick_input.mouse_y))
+        if player.health <= 0:
+            break
+    checksum = world_checksum(player, enemies, projectiles)
+    pygame.quit()
+    return ticks, checksum
+
+
+def verify(recording, ticks, checksum):
+    """Report whether a replay ended where the recording did; returns True if it did."""
+    if checksum is None:
+        print(f"Stopped after {ticks}/{len(recording.ticks)} ticks, not verified")
+        return True
+    if ticks != len(recording.ticks) or checksum != recording.checksum:
+        print(f"MISMATCH: {ticks}/{len(recording.ticks)} ticks replayed, final state checksum "
+              f"{checksum}, recorded {recording.checksum}")
+        return False
+    print(f"Final state checksum {checksum} matches the recording")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording")
+    parser.add_argument("--realtime", action="store_true",
+                        help="render in a window at the recorded tick rate")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="profile a full speed replay and write a Chrome trace to PATH")
+    args = parser.parse_args()
+
+    recording = Recording.load(args.recording)
+    if recording.tick_rate != GAME_RULES["TICK_RATE"]:
+        print(f"Warning: recorded at {recording.tick_rate} ticks/s, "
+              f"the game runs at {GAME_RULES['TICK_RATE']}")
+    GAME_RULES["TICK_RATE"] = recording.tick_rate
+
+    if args.realtime:
+        sys.exit(0 if verify(recording, *replay_realtime(recording)) else 1)
+
+    # No window or sound needed at full speed
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    profiler.enabled = args.trace is not None
+    result = replay_headless(recording)
+    print(f"Replayed {result['ticks']}/{len(recording.ticks)} ticks in {result['seconds']:.2f}s "
+          f"({result['ticks_per_second']:.0f} ticks/s), {result['kills']} kills, "
+          f"health {result['health']}")
+    if args.trace:
+        profiler.export_trace(args.trace)
+    if not verify(recording, result["ticks"], result["checksum"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Break the game's cold start down by module import, startup step and asset.
+
+Usage: python startup_report.py [--headless]
+
+Run it in a fresh process: modules that are already imported cost nothing.
+"""
+import time
+
+START = time.perf_counter()
+
+import argparse
+import importlib
+import os
+import sys
+
+# Third-party libraries first, then the game's modules with their dependencies
+# before them, so each import is timed without the ones above it
+MODULES = [
+    "numpy",  # pygame imports it too
+    "pygame",
+    "constants.game_rules",
+    "constants.colors",
+    "constants.file_paths",
+    "constants.maze_variants",
+    "utils.sim_clock",
+    "utils.asset_manager",
+    "utils.sound_manager",
+    "utils.preloader",
+    "utils.window",
+    "utils.hud",
+    "utils.profiler",
+    "utils.dirty_rects",
+    "utils.culling",
+    "utils.render_queue",
+    "utils.line_of_sight",
+    "utils.spatial_hash",
+    "utils.object_pool",
+    "utils.replay",
+    "utils.path_scheduler",
+    "utils.maze_generator",
+    "entities.maze",
+    "utils.flow_field",
+    "utils.hpa",
+    "entities.projectile",
+    "entities.player",
+    "entities.enemy",
+    "init",
+    "main"
+]
+
+
+def time_imports():
+    """Import MODULES in order and return (module, seconds) pairs."""
+    timings = []
+    for name in MODULES:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        timings.append((name, time.perf_counter() - start))
+    return timings
+
+
+def image_label(key):
+    """Describe an asset_manager cache key: (file name, size[, rotation steps])."""
+    file_name, (width, height) = key[:2]
+    label = f"{file_name} {width}x{height}"
+    return label + f" x{key[2]} rotations" if len(key) > 2 else label
+
+
+def print_section(title, rows):
+    print(f"\n{title} ({sum(seconds for _, seconds in rows) * 1000:.1f}ms)")
+    for name, seconds in sorted(rows, key=lambda row: -row[1]):
+        print(f"  {seconds * 1000:8.2f}ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--headless", action="store_true",
+                        help="use the dummy video and audio drivers")
+    args = parser.parse_args()
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+    imports = time_imports()
+
+    # Importing must not touch the display or the mixer
+    import pygame
+    from utils.sound_manager import sound_manager
+    side_effects = [name for name, active in [
+        ("display", pygame.display.get_init()),
+        ("mixer", pygame.mixer.get_init()),
+        ("sounds", sound_manager.sounds is not None)
+    ] if active]
+
+    from init import initialize_game
+    from utils.asset_manager import asset_manager
+    steps = initialize_game()
+    total = time.perf_counter() - START
+    pygame.quit()
+
+    print_section("Imports", imports)
+    print_section("Startup steps", list(steps.items()))
+    print_section("Images", [(image_label(key), seconds)
+                             for key, seconds in asset_manager.load_seconds.items()])
+    print_section("Sounds", list(sound_manager.load_seconds.items()))
+    print(f"\nCold start: {total * 1000:.1f}ms")
+    if side_effects:
+        print(f"Import side effects: {', '.join(side_effects)} initialized")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import pygame
+import time
+from constants.file_paths import IMAGES_FOLDER
+from constants.game_rules import GAME_RULES
+
+
+class AssetManager:
+    def __init__(self):
+        self.images = {}  # (file name, size) -> shared surface
+        self.rotations = {}  # (file name, size, steps) -> list of rotated surfaces
+        self.hits = 0
+        self.misses = 0
+        self.load_seconds = {}  # Cache key -> seconds spent building the entry
+
+    def get_image(self, file_name, size):
+        """Return the shared surface for an image scaled to size, decoding it only on first use."""
+        key = (file_name, size)
+        image = self.images.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        start = time.perf_counter()
+        image = self.add_image(file_name, size, decode_image(file_name, size))
+        self.load_seconds[key] = time.perf_counter() - start
+        return image
+
+    def add_image(self, file_name, size, image):
+        """Cache an already decoded image, converting it to the display format."""
+        self.images[(file_name, size)] = image = to_display_format(image)
+        return image
+
+    def get_rotations(self, file_name, size, steps=None):
+        """Return a table of the image pre-rotated at steps evenly spaced angles.
+
+        More steps give smoother turning at the cost of memory; the default
+        comes from GAME_RULES["ROTATION_STEPS"].
+        """
+        steps = steps or GAME_RULES["ROTATION_STEPS"]
+        key = (file_name, size, steps)
+        rotations = self.rotations.get(key)
+        if rotations is not None:
+            self.hits += 1
+            return rotations
+
+        image = self.get_image(file_name, size)
+        start = time.perf_counter()
+        rotations = self.add_rotations(file_name, size, rotate_steps(image, steps))
+        self.load_seconds[key] = time.perf_counter() - start
+        return rotations
+
+    def add_rotations(self, file_name, size, rotations):
+        """Cache an already built rotation table, converting it to the display format."""
+        rotations = [to_display_format(image) for image in rotations]
+        self.rotations[(file_name, size, len(rotations))] = rotations
+        return rotations
+
+    def memory_usage(self):
+        """Approximate number of bytes held by the cached surfaces."""
+        surfaces = list(self.images.values())
+        for rotations in self.rotations.values():
+            surfaces.extend(rotations)
+        return sum(image.get_bytesize() * image.get_width() * image.get_height()
+                   for image in surfaces)
+
+    def stats(self):
+        return {
+            "images": len(self.images),
+            "rotation_tables": len(self.rotations),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes": self.memory_usage()
+        }
+
+
+def decode_image(file_name, size):
+    """Load an image scaled to size; it doesn't touch the display, so worker threads may call it."""
+    image = pygame.image.load(f"{IMAGES_FOLDER}/{file_name}")
+    return pygame.transform.smoothscale(image, size)
+
+
+def rotate_steps(image, steps):
+    """The image rotated at steps evenly spaced angles, as used by rotated()."""
+    return [pygame.transform.rotate(image, step * 360 / steps) for step in range(steps)]
+
+
+def to_display_format(image):
+    """Match the display pixel format so blits don't convert every frame.
+
+    Needs the window, and pygame only allows it on the main thread.
+    """
+    if pygame.display.get_surface() is not None:
+        return image.convert_alpha()
+    return image
+
+
+def is_display_format(image):
+    """True if blitting image onto the display needs no per-pixel conversion."""
+    display = pygame.display.get_surface()
+    if display is None:
+        return True  # Nothing to match yet
+    if image.get_flags() & pygame.SRCALPHA:
+        return image.get_bitsize() == 32 and image.get_masks()[:3] == display.get_masks()[:3]
+    return image.get_bitsize() == display.get_bitsize() and image.get_masks() == display.get_masks()
+
+
+def rotated(rotations, angle):
+    """Pick the pre-rotated surface closest to angle (degrees, counter-clockwise)."""
+    steps = len(rotations)
+    return rotations[round(angle * steps / 360) % steps]
+
+
+# Create a singleton instance of AssetManager
+asset_manager = AssetManager()
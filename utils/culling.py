@@ -0,0 +1,73 @@
+import numpy as np
+import pygame
+
+from constants.game_rules import GAME_RULES
+
+
+def cell_range(view, cell_size, cols, rows):
+    """First and last column and row of a cols x rows grid of cells that overlap view."""
+    return (max(0, view.left // cell_size),
+            max(0, view.top // cell_size),
+            min(cols - 1, (view.right - 1) // cell_size),
+            min(rows - 1, (view.bottom - 1) // cell_size))
+
+
+class Culler:
+    """Works out once per frame which sprites the camera can see.
+
+    begin_frame fixes the visible world rectangle; the filters then drop
+    every enemy and projectile that can't overlap it, so drawing costs
+    grow with what is on screen rather than with the world's population.
+    """
+
+    def __init__(self):
+        self.view = pygame.Rect(0, 0, 0, 0)  # Visible world rectangle this frame
+        self.visible = 0  # Sprites kept this frame
+        self.culled = 0  # Sprites skipped this frame
+        self.frames = 0
+        self.total_visible = 0
+        self.total_culled = 0
+
+    def begin_frame(self, camera_x, camera_y, size):
+        """Set the visible world rectangle for a screen of size seen from the camera."""
+        self.view = pygame.Rect(int(camera_x), int(camera_y), *size)
+        self.visible = self.culled = 0
+        self.frames += 1
+
+    def count(self, visible, total):
+        self.visible += visible
+        self.culled += total - visible
+        self.total_visible += visible
+        self.total_culled += total - visible
+
+    def enemies(self, enemies):
+        """The enemies that overlap the view."""
+        # Room for the rotated sprite and the blend back to the previous tick
+        margin = GAME_RULES["ENEMY_SIZE"] + GAME_RULES["ENEMY_SPEED"]
+        area = self.view.inflate(2 * margin, 2 * margin)
+        visible = [enemy for enemy in enemies if area.collidepoint(enemy.x, enemy.y)]
+        self.count(len(visible), len(enemies))
+        return visible
+
+    def projectiles(self, projectiles):
+        """Indices of the live projectiles that overlap the view."""
+        n = projectiles.count
+        margin = GAME_RULES["PROJECTILE_SIZE"] + projectiles.speed
+        xs, ys = projectiles.x[:n], projectiles.y[:n]
+        mask = ((xs >= self.view.left - margin) & (xs < self.view.right + margin)
+                & (ys >= self.view.top - margin) & (ys < self.view.bottom + margin))
+        visible = np.flatnonzero(mask)
+        self.count(len(visible), n)
+        return visible
+
+    def stats(self):
+        return {
+            "visible": self.visible,
+            "culled": self.culled,
+            "culled_per_frame": self.total_culled / self.frames if self.frames else 0,
+            "visible_per_frame": self.total_visible / self.frames if self.frames else 0
+        }
+
+
+# Create a singleton instance of Culler
+culler = Culler()
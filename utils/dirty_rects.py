@@ -0,0 +1,66 @@
+import pygame
+from constants.game_rules import GAME_RULES
+
+
+class DirtyRects:
+    """Pushes only the parts of the screen that changed while the view stands still.
+
+    A view is anything that fixes the background, e.g. the camera position and
+    maze. When it changes the whole background is drawn and flipped. Once it
+    holds still for a frame, a copy of the background is kept; later frames
+    restore the areas drawn over last frame from that copy, draw sprites
+    again and update just those areas.
+    """
+
+    def __init__(self):
+        self.enabled = GAME_RULES["DIRTY_RECTS"]
+        self.view = None
+        self.background = None  # Copy of the clean background for self.view
+        self.previous_rects = []  # Drawn over last frame, restored this frame
+        self.rects = []  # Drawn over this frame
+        self.full_frame = True
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def begin_frame(self, surface, view, draw_background):
+        """Leave the clean background for view on surface, calling draw_background if needed."""
+        self.previous_rects, self.rects = self.rects, []
+        if not self.enabled or view != self.view:
+            # Scrolling, or a different screen: nothing can be reused
+            self.view = view
+            self.background = None
+            self.full_frame = True
+            draw_background(surface)
+        elif self.background is None:
+            # The view just stopped moving, so remember its background
+            self.full_frame = True
+            draw_background(surface)
+            self.background = surface.copy()
+        else:
+            self.full_frame = False
+            for rect in self.previous_rects:
+                surface.blit(self.background, rect, rect)
+
+    def add(self, rect):
+        """Record an area drawn over the background, such as the rect returned by blit."""
+        if rect is not None:
+            self.rects.append(rect)
+
+    def add_all(self, rects):
+        self.rects.extend(rects)
+
+    def end_frame(self):
+        """Show the frame: a flip after a full redraw, otherwise only the changed areas."""
+        if self.full_frame:
+            self.full_frames += 1
+            pygame.display.flip()
+        else:
+            self.partial_frames += 1
+            pygame.display.update(self.previous_rects + self.rects)
+
+    def stats(self):
+        return {"full_frames": self.full_frames, "partial_frames": self.partial_frames}
+
+
+# Create a singleton instance of DirtyRects
+dirty_rects = DirtyRects()
@@ -0,0 +1,152 @@
+import heapq
+import math
+from array import array
+import numpy as np
+from constants.game_rules import GAME_RULES
+from entities.maze import WALL, FLOOR
+
+# Same moves and costs as Enemy.find_path: cardinals cost 1, diagonals 1.4
+DIRECTIONS = [
+    (0, -1, 1), (0, 1, 1), (-1, 0, 1), (1, 0, 1),  # Cardinal directions
+    (-1, -1, 1.4), (1, -1, 1.4), (-1, 1, 1.4), (1, 1, 1.4)  # Diagonal directions
+]
+
+
+class FlowField:
+    """Next-step directions from every walkable tile towards a single target tile.
+
+    One Dijkstra pass from the target is shared by all enemies, so the cost of
+    pathfinding no longer grows with the number of enemies.
+
+    The pass stops as soon as every source tile (where the enemies stand) is
+    settled, and expands at most FLOW_FIELD_BUDGET_NODES tiles per update, so
+    a big map spreads a rebuild over several ticks. Enemies keep following
+    the previous field until the new one is finished, and use the rebuild's
+    progress only on tiles the previous field doesn't cover.
+    """
+
+    def __init__(self, maze, budget=None):
+        self.maze = maze
+        self.budget = budget  # None reads GAME_RULES on every update
+        self.target = None
+        self.maze_version = None
+        # Per tile index: path cost to the target, index of the next tile towards
+        # it, and 1 once the cost is final
+        self.distance, self.next_step, self.settled = self.empty_arrays()
+        self.spare = self.empty_arrays()  # Reused by the next rebuild rather than reallocated
+        self.complete = False  # Every tile that can reach the target has a next step
+        self.search = None  # Rebuild in progress; see start()
+        self.rebuilds = 0
+        self.expanded = 0
+
+    def update(self, target, sources=()):
+        """Work towards a field leading to target that covers the tiles in sources.
+
+        A rebuild starts when the target or the maze changed, or a source is
+        beyond where the last one stopped. One already under way is finished
+        first, even if the target moved on meanwhile.
+        """
+        if self.search is None:
+            if (target == self.target and self.maze.version == self.maze_version
+                    and self.covers(sources)):
+                return
+            self.start(target)
+        self.step(sources)
+
+    def covers(self, sources):
+        """True if the field has a next step for every source tile that can have one."""
+        if self.complete:
+            return True
+        maze = self.maze
+        return all(self.distance[maze.index(col, row)] < math.inf for col, row in sources
+                   if 0 <= col < maze.width and 0 <= row < maze.height)
+
+    def empty_arrays(self):
+        size = len(self.maze.tiles)
+        return array("d", [math.inf]) * size, array("i", [-1]) * size, bytearray(size)
+
+    def start(self, target):
+        """Begin a rebuild towards target; it runs in step()."""
+        maze = self.maze
+        self.rebuilds += 1
+        # Indexed like maze.tiles; the wall border means no bounds checks below
+        # Clearing in place is several times faster than allocating on big maps
+        distance, next_step, settled = self.spare
+        np.frombuffer(distance).fill(math.inf)
+        np.frombuffer(next_step, dtype=np.int32).fill(-1)
+        np.frombuffer(settled, dtype=np.uint8).fill(0)
+
+        open_set = []
+        goal_col, goal_row = target
+        if 0 <= goal_col < maze.width and 0 <= goal_row < maze.height:
+            goal = maze.index(goal_col, goal_row)
+            distance[goal] = 0
+            open_set.append((0, goal))
+        self.search = (target, maze.version, open_set, distance, next_step, settled)
+
+    def step(self, sources):
+        """Expand up to the budget of tiles, and swap the new field in once it is done."""
+        maze = self.maze
+        tiles = maze.tiles
+        stride = maze.stride
+        target, version, open_set, distance, next_step, settled = self.search
+        budget = self.budget or GAME_RULES["FLOW_FIELD_BUDGET_NODES"]
+
+        # Source tiles not settled yet; once there are none the field is good enough
+        pending = {maze.index(col, row) for col, row in sources
+                   if 0 <= col < maze.width and 0 <= row < maze.height}
+        pending = {i for i in pending if not settled[i]}
+
+        # (index offset, cost, the two orthogonal tiles a diagonal passes between)
+        moves = [(dy * stride + dx, cost, dx if dx and dy else 0, dy * stride if dx and dy else 0)
+                 for dx, dy, cost in DIRECTIONS]
+
+        expanded = 0
+        while open_set and pending and not (budget and expanded >= budget):
+            cost, current = heapq.heappop(open_set)
+            if cost > distance[current]:
+                continue  # Stale heap entry
+            settled[current] = 1
+            pending.discard(current)
+            expanded += 1
+
+            for offset, step_cost, side_x, side_y in moves:
+                neighbor = current + offset
+                if tiles[neighbor] != FLOOR:
+                    continue
+
+                # Diagonals may not squeeze between two corner walls
+                if side_x and tiles[current + side_x] == WALL and tiles[current + side_y] == WALL:
+                    continue
+
+                new_cost = cost + step_cost
+                if new_cost < distance[neighbor]:
+                    distance[neighbor] = new_cost
+                    # Moves are symmetric, so from neighbor the next step is current
+                    next_step[neighbor] = current
+                    heapq.heappush(open_set, (new_cost, neighbor))
+        self.expanded += expanded
+
+        if open_set and pending:
+            return  # Out of budget; carry on next update
+        self.spare = (self.distance, self.next_step, self.settled)
+        self.target = target
+        self.maze_version = version
+        self.distance = distance
+        self.next_step = next_step
+        self.settled = settled
+        self.complete = not open_set
+        self.search = None
+
+    def get_next_step(self, tile):
+        """Return the next tile towards the target, or None if unreachable or already there."""
+        col, row = tile
+        if not (0 <= col < self.maze.width and 0 <= row < self.maze.height):
+            return None
+        step = self.next_step[self.maze.index(col, row)]
+        if step < 0 and self.search is not None:
+            # Not covered yet; the part of the rebuild done so far may already lead on
+            step = self.search[4][self.maze.index(col, row)]  # Its next_step
+        if step < 0:
+            return None
+        return step % self.maze.stride - 1, step // self.maze.stride - 1
@@ -0,0 +1,332 @@
+import heapq
+import weakref
+
+import numpy as np
+
+from constants.game_rules import GAME_RULES
+from entities.maze import WALL, FLOOR
+from utils.flow_field import DIRECTIONS
+
+# One pathfinder per maze, dropped together with the maze
+_pathfinders = weakref.WeakKeyDictionary()
+
+
+def pathfinder_for(maze):
+    """The shared HierarchicalPathfinder of a maze, built on first use."""
+    pathfinder = _pathfinders.get(maze)
+    if pathfinder is None:
+        pathfinder = _pathfinders[maze] = HierarchicalPathfinder(maze)
+    return pathfinder
+
+
+class HierarchicalPathfinder:
+    """HPA*: plans over cluster entrances, then refines one stretch at a time.
+
+    The maze is cut into square clusters. Where a run of open tiles crosses
+    the border between two clusters, its middle pair of tiles become
+    entrance nodes joined by a step of cost 1. Distances between the
+    entrances of one cluster are computed on first use and cached, so a
+    search expands about one node per entrance along the way rather than
+    one per tile. The concrete tiles between two waypoints come from an A*
+    confined to their clusters, run only when an enemy gets there.
+
+    plan() is a generator that yields after every node it expands, including
+    those of the cluster caches it fills, so a caller can spread one plan
+    over as many ticks as its node budget needs.
+
+    Tile changes are found by comparing the maze with a snapshot whenever
+    maze.version moves; only the borders and caches of the clusters around
+    the changed tiles are rebuilt.
+    """
+
+    def __init__(self, maze, cluster_tiles=None):
+        self.maze = maze
+        self.size = cluster_tiles or GAME_RULES["HPA_CLUSTER_TILES"]
+        self.clusters_x = -(-maze.width // self.size)
+        self.clusters_y = -(-maze.height // self.size)
+        stride = maze.stride
+        # (index offset, cost, the two orthogonal tiles a diagonal passes between)
+        self.moves = [(dy * stride + dx, cost, dx if dx and dy else 0, dy * stride if dx and dy else 0)
+                      for dx, dy, cost in DIRECTIONS]
+
+        self.borders = {}  # (cluster, neighbor cluster) -> [(tile in cluster, tile in neighbor)]
+        self.entrances = {}  # Cluster -> set of its entrance tiles
+        self.links = {}  # Entrance tile -> entrance tiles one step away in other clusters
+        self.distances = {}  # Cluster -> {entrance: {other entrance: cost}}, filled lazily
+        self.version = maze.version
+        self.snapshot = maze.tile_array.copy()
+        self.rebuilds = 0
+        self.expanded = 0
+
+        for cy in range(self.clusters_y):
+            for cx in range(self.clusters_x):
+                self.build_borders((cx, cy))
+        self.link_entrances()
+
+    def cluster_of(self, index):
+        stride = self.maze.stride
+        return (index % stride - 1) // self.size, (index // stride - 1) // self.size
+
+    def cluster_bounds(self, cluster):
+        """First and last column and row of a cluster, inclusive."""
+        cx, cy = cluster
+        return (cx * self.size, cy * self.size,
+                min(self.maze.width, (cx + 1) * self.size) - 1,
+                min(self.maze.height, (cy + 1) * self.size) - 1)
+
+    def build_borders(self, cluster):
+        """Find the entrances on the right and bottom borders of a cluster."""
+        tiles = self.maze.tiles
+        index = self.maze.index
+        first_col, first_row, last_col, last_row = self.cluster_bounds(cluster)
+        cx, cy = cluster
+
+        # (neighbor, pairs of facing tiles along the shared border)
+        sides = []
+        if cx + 1 < self.clusters_x:
+            sides.append(((cx + 1, cy), [(index(last_col, row), index(last_col + 1, row))
+                                         for row in range(first_row, last_row + 1)]))
+        if cy + 1 < self.clusters_y:
+            sides.append(((cx, cy + 1), [(index(col, last_row), index(col, last_row + 1))
+                                         for col in range(first_col, last_col + 1)]))
+
+        for neighbor, pairs in sides:
+            transitions = []
+            run = []
+            for a, b in pairs + [(None, None)]:  # Sentinel closes the last run
+                if a is not None and tiles[a] == FLOOR and tiles[b] == FLOOR:
+                    run.append((a, b))
+                elif run:
+                    transitions.append(run[len(run) // 2])
+                    run = []
+            self.borders[(cluster, neighbor)] = transitions
+
+    def link_entrances(self):
+        """Rebuild the entrance sets and the steps between clusters from the borders."""
+        self.entrances = {}
+        self.links = {}
+        for (cluster, neighbor), transitions in self.borders.items():
+            for a, b in transitions:
+                self.entrances.setdefault(cluster, set()).add(a)
+                self.entrances.setdefault(neighbor, set()).add(b)
+                self.links.setdefault(a, set()).add(b)
+                self.links.setdefault(b, set()).add(a)
+
+    def update(self):
+        """Bring the clusters around changed tiles up to date with the maze."""
+        if self.maze.version == self.version:
+            return
+        self.version = self.maze.version
+        current = self.maze.tile_array
+        rows, cols = np.nonzero(current != self.snapshot)
+        self.snapshot = current.copy()
+
+        # Padded array coordinates back to tile coordinates
+        changed = {(int(col - 1) // self.size, int(row - 1) // self.size)
+                   for col, row in zip(cols, rows)
+                   if 0 < col <= self.maze.width and 0 < row <= self.maze.height}
+        if not changed:
+            return
+        self.rebuilds += 1
+
+        # A cluster's left and top borders belong to the clusters before it
+        touched = set()
+        for cx, cy in changed:
+            for cluster in ((cx, cy), (cx - 1, cy), (cx, cy - 1)):
+                if 0 <= cluster[0] < self.clusters_x and 0 <= cluster[1] < self.clusters_y:
+                    self.build_borders(cluster)
+            touched.update([(cx, cy), (cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)])
+        self.link_entrances()
+        for cluster in touched:
+            self.distances.pop(cluster, None)
+
+    def search(self, start, bounds, goal=None):
+        """A* (Dijkstra without a goal) from start over tiles inside bounds, run to the end.
+
+        Returns (cost so far, came from) dicts keyed by tile index.
+        """
+        return finish(self.search_steps(start, bounds, goal))
+
+    def search_steps(self, start, bounds, goal=None):
+        """search() as a generator that yields after each node it expands."""
+        tiles = self.maze.tiles
+        stride = self.maze.stride
+        first_col, first_row, last_col, last_row = bounds
+        if goal is not None:
+            goal_col, goal_row = goal % stride, goal // stride
+
+        cost_so_far = {start: 0}
+        came_from = {}
+        open_set = [(0, 0, start)]
+        while open_set:
+            _, cost, current = heapq.heappop(open_set)
+            if cost > cost_so_far[current]:
+                continue  # Stale heap entry
+            self.expanded += 1
+            yield
+            if current == goal:
+                break
+
+            for offset, step_cost, side_x, side_y in self.moves:
+                neighbor = current + offset
+                if tiles[neighbor] != FLOOR:
+                    continue
+                col, row = neighbor % stride - 1, neighbor // stride - 1
+                if not (first_col <= col <= last_col and first_row <= row <= last_row):
+                    continue
+                # Diagonals may not squeeze between two corner walls
+                if side_x and tiles[current + side_x] == WALL and tiles[current + side_y] == WALL:
+                    continue
+
+                new_cost = cost + step_cost
+                if new_cost < cost_so_far.get(neighbor, float("inf")):
+                    cost_so_far[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    estimate = new_cost
+                    if goal is not None:
+                        estimate += octile(abs(col + 1 - goal_col), abs(row + 1 - goal_row))
+                    heapq.heappush(open_set, (estimate, new_cost, neighbor))
+        return cost_so_far, came_from
+
+    def cluster_distances(self, cluster):
+        """Cached costs between every pair of entrances of a cluster, as a generator.
+
+        Yields after each node expanded while filling the cache; the cache
+        entry is only stored once complete.
+        """
+        distances = self.distances.get(cluster)
+        if distances is None:
+            distances = {}
+            entrances = self.entrances.get(cluster, ())
+            bounds = self.cluster_bounds(cluster)
+            for entrance in entrances:
+                cost_so_far, _ = yield from self.search_steps(entrance, bounds)
+                distances[entrance] = {other: cost_so_far[other] for other in entrances
+                                       if other != entrance and other in cost_so_far}
+            self.distances[cluster] = distances
+        return distances
+
+    def plan(self, start_tile, goal_tile):
+        """Plan from one tile to another, as a generator yielding after each node expanded.
+
+        Returns waypoint tiles up to and including the goal, each reachable
+        from the previous one through at most two clusters, or no waypoints
+        if the goal can't be reached.
+        """
+        self.update()
+        maze = self.maze
+        if not (0 <= goal_tile[0] < maze.width and 0 <= goal_tile[1] < maze.height):
+            return []
+        start, goal = maze.index(*start_tile), maze.index(*goal_tile)
+        if start == goal or maze.tiles[goal] != FLOOR:
+            return []
+
+        start_cluster, goal_cluster = self.cluster_of(start), self.cluster_of(goal)
+        if start_cluster == goal_cluster:
+            cost_so_far, _ = yield from self.search_steps(start, self.cluster_bounds(start_cluster), goal)
+            if goal in cost_so_far:
+                return [goal_tile]
+
+        # Temporary edges from the start and to the goal through their own clusters
+        from_start, _ = yield from self.search_steps(start, self.cluster_bounds(start_cluster))
+        to_goal, _ = yield from self.search_steps(goal, self.cluster_bounds(goal_cluster))
+        goal_entrances = {entrance: to_goal[entrance]
+                          for entrance in self.entrances.get(goal_cluster, ()) if entrance in to_goal}
+
+        stride = maze.stride
+        goal_col, goal_row = goal % stride, goal // stride
+
+        def estimate(node):
+            return octile(abs(node % stride - goal_col), abs(node // stride - goal_row))
+
+        cost_so_far = {start: 0}
+        came_from = {}
+        open_set = []
+        for entrance in self.entrances.get(start_cluster, ()):
+            if entrance in from_start:
+                cost_so_far[entrance] = from_start[entrance]
+                came_from[entrance] = start
+                heapq.heappush(open_set, (from_start[entrance] + estimate(entrance),
+                                          from_start[entrance], entrance))
+
+        while open_set:
+            _, cost, current = heapq.heappop(open_set)
+            if cost > cost_so_far[current]:
+                continue  # Stale heap entry
+            self.expanded += 1
+            yield
+            if current == goal:
+                break
+
+            edges = [(other, 1) for other in self.links.get(current, ())]
+            distances = yield from self.cluster_distances(self.cluster_of(current))
+            edges.extend(distances.get(current, {}).items())
+            if current in goal_entrances:
+                edges.append((goal, goal_entrances[current]))
+
+            for neighbor, step_cost in edges:
+                new_cost = cost + step_cost
+                if new_cost < cost_so_far.get(neighbor, float("inf")):
+                    cost_so_far[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    heapq.heappush(open_set, (new_cost + estimate(neighbor), new_cost, neighbor))
+
+        if goal not in came_from:
+            return []
+
+        waypoints = []
+        node = goal
+        while node != start:
+            waypoints.append((node % stride - 1, node // stride - 1))
+            node = came_from[node]
+        waypoints.reverse()
+        return waypoints
+
+    def refine(self, from_tile, to_tile):
+        """Concrete tiles from one waypoint to the next (excluding from_tile), or [] if blocked."""
+        self.update()
+        maze = self.maze
+        start, goal = maze.index(*from_tile), maze.index(*to_tile)
+        if start == goal:
+            return []
+
+        # Both waypoints lie in the same cluster or in two neighboring ones
+        bounds = [self.cluster_bounds(self.cluster_of(index)) for index in (start, goal)]
+        first_col, first_row, last_col, last_row = (
+            min(bounds[0][0], bounds[1][0]), min(bounds[0][1], bounds[1][1]),
+            max(bounds[0][2], bounds[1][2]), max(bounds[0][3], bounds[1][3]))
+        _, came_from = self.search(start, (first_col, first_row, last_col, last_row), goal)
+        if goal not in came_from:
+            return []
+
+        stride = maze.stride
+        path = []
+        node = goal
+        while node != start:
+            path.append((node % stride - 1, node // stride - 1))
+            node = came_from[node]
+        path.reverse()
+        return path
+
+    def stats(self):
+        return {
+            "clusters": self.clusters_x * self.clusters_y,
+            "entrances": sum(len(entrances) for entrances in self.entrances.values()),
+            "cached_clusters": len(self.distances),
+            "incremental_rebuilds": self.rebuilds,
+            "nodes_expanded": self.expanded
+        }
+
+
+def finish(steps):
+    """Run a search generator to the end and return its result."""
+    try:
+        while True:
+            next(steps)
+    except StopIteration as done:
+        return done.value
+
+
+def octile(dx, dy):
+    """Cheapest cost of dx by dy tiles with cardinal steps of 1 and diagonals of 1.4."""
+    return max(dx, dy) + 0.4 * min(dx, dy)
@@ -0,0 +1,54 @@
+import pygame
+
+HUD_HEIGHT = 60  # Tall enough for the health bar and the kill counter
+
+
+class Hud:
+    """Fonts, rendered strings and the in-game overlay, built once and reused.
+
+    The overlay is redrawn onto its cached surface only when the kill count,
+    health or screen width change; every other frame costs a single blit.
+    """
+
+    def __init__(self):
+        self.fonts = {}  # Size -> font
+        self.texts = {}  # (text, size, color) -> rendered surface
+        self.surface = None
+        self.state = None  # Values the cached surface was drawn with
+        self.redraws = 0
+
+    def get_font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def render_text(self, text, size, color):
+        """Return the shared surface for a string, rendering it only on first use."""
+        key = (text, size, color)
+        rendered = self.texts.get(key)
+        if rendered is None:
+            rendered = self.texts[key] = self.get_font(size).render(text, True, color)
+        return rendered
+
+    def sprite(self, width, player):
+        """The overlay for a screen width and where it goes, redrawn only if it changed."""
+        state = (player.kill_count, player.health, width)
+        if state != self.state:
+            self.state = state
+            self.redraws += 1
+            self.surface = pygame.Surface((width, HUD_HEIGHT), pygame.SRCALPHA)
+            player.draw_health(self.surface)
+
+            # Draw kill counter in top right; old counts are never shown again
+            kill_text = self.get_font(40).render(
+                f"Kills: {player.kill_count}", True, (255, 255, 255))
+            self.surface.blit(kill_text, (width - 150, 20))
+
+        return self.surface, (0, 0)
+
+
+# Create a singleton instance of Hud
+hud = Hud()
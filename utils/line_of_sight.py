@@ -0,0 +1,40 @@
+def is_line_clear(maze, start, end):
+    """Walk the tiles crossed by the segment between two tile centers (grid DDA).
+
+    Every crossed tile is visited exactly once. Where the segment passes exactly
+    through a tile corner, both tiles touching that corner must be open so
+    sight can't slip between two diagonal walls. The start tile is not checked.
+    """
+    col, row = start
+    end_col, end_row = end
+    dx, dy = end_col - col, end_row - row
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    dx, dy = abs(dx), abs(dy)
+
+    # Distance along the segment to the next vertical / horizontal tile edge,
+    # scaled by 2 * dx * dy so everything stays in exact integers.
+    # Moving from a tile center, the first edge is half a tile away.
+    next_x = dy if dx else None
+    next_y = dx if dy else None
+
+    while (col, row) != (end_col, end_row):
+        if next_y is None or (next_x is not None and next_x < next_y):
+            col += step_x
+            next_x += 2 * dy
+        elif next_x is None or next_y < next_x:
+            row += step_y
+            next_y += 2 * dx
+        else:
+            # Exactly through a corner, so both side tiles must be open
+            if maze.is_wall(col + step_x, row) or maze.is_wall(col, row + step_y):
+                return False
+            col += step_x
+            row += step_y
+            next_x += 2 * dy
+            next_y += 2 * dx
+
+        if maze.is_wall(col, row):  # Wall detected
+            return False
+
+    return True
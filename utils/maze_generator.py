@@ -0,0 +1,215 @@
+import random
+
+import numpy as np
+from constants.maze_variants import MAZE
+
+WALL = 1
+FLOOR = 0
+
+
+# Big backtracker mazes are assembled from square blocks of this many cells per side
+BLOCK_CELLS = 32
+# Distinct full blocks carved per maze; each is also used rotated and mirrored
+BLOCK_LIBRARY = 16
+
+
+def carve_backtracker(width, height, rng):
+    """Carve a perfect maze into a width x height tile buffer with an iterative recursive backtracker.
+
+    Cells sit on odd coordinates with walls between them, so even sizes leave
+    an extra wall along the right and bottom edges. Returns the tiles as one
+    bytearray, row after row.
+    """
+    tiles = bytearray([WALL]) * (width * height)
+
+    # Padded so neighbour lookups never leave the buffer; only cells start unvisited
+    pad = 2 * width
+    visited = bytearray([1]) * (width * height + 2 * pad)
+    cells_per_row = len(range(1, width - 1, 2))
+    for row in range(1, height - 1, 2):
+        first = pad + row * width + 1
+        visited[first:first + 2 * cells_per_row:2] = bytes(cells_per_row)
+
+    start = width + 1
+    if width < 3 or height < 3:
+        return tiles
+
+    tiles[start] = FLOOR
+    visited[pad + start] = 1
+    stack = [start]
+    pick = rng.random
+    right, down = 2 + pad, 2 * width + pad
+    left, up = pad - 2, pad - 2 * width
+
+    # Hot loop for big maps: neighbour checks are unrolled and names kept local
+    while stack:
+        current = stack[-1]
+        neighbors = []
+        if not visited[current + right]:
+            neighbors.append(current + 2)
+        if not visited[current + left]:
+            neighbors.append(current - 2)
+        if not visited[current + down]:
+            neighbors.append(current + 2 * width)
+        if not visited[current + up]:
+            neighbors.append(current - 2 * width)
+        if not neighbors:
+            stack.pop()
+            continue
+
+        neighbor = neighbors[int(pick() * len(neighbors))]
+        visited[pad + neighbor] = 1
+        tiles[neighbor] = FLOOR
+        tiles[(current + neighbor) >> 1] = FLOOR  # Knock down the wall between
+        if len(neighbors) == 1:
+            stack[-1] = neighbor  # Nothing left to carve from current, skip revisiting it
+        else:
+            stack.append(neighbor)
+
+    return tiles
+
+
+def carve_block(cols, rows, rng):
+    """Backtracker maze of cols x rows cells as a (2 * rows + 1) x (2 * cols + 1) tile array."""
+    width, height = 2 * cols + 1, 2 * rows + 1
+    return np.frombuffer(carve_backtracker(width, height, rng), dtype=np.uint8).reshape(height, width)
+
+
+def generate_backtracker(width, height, seed=None):
+    """Perfect maze in the style of a recursive backtracker.
+
+    Maps up to BLOCK_CELLS cells a side are carved in one walk. A pure-Python
+    walk over the 1M cells of a 2000x2000 map takes over a second, so bigger
+    maps are built from blocks of BLOCK_CELLS x BLOCK_CELLS cells instead:
+    a backtracker over the grid of blocks decides which neighbouring blocks
+    get a door between them, and each full block is a backtracker maze picked
+    from a small seeded library in one of its 8 orientations. Blocks cut
+    short by the map edge are carved fresh. A tree of trees is still a
+    perfect maze, so every floor tile stays reachable.
+
+    Even sizes leave an extra wall along the right and bottom edges. Returns
+    one bytearray of tiles per row.
+    """
+    rng = random.Random(seed)
+    cols, rows = max(0, (width - 1) // 2), max(0, (height - 1) // 2)
+    if cols <= BLOCK_CELLS and rows <= BLOCK_CELLS:
+        return rows_from_buffer(carve_backtracker(width, height, rng), width, height)
+
+    blocks_x, blocks_y = -(-cols // BLOCK_CELLS), -(-rows // BLOCK_CELLS)
+    library = []
+    for _ in range(BLOCK_LIBRARY):
+        block = carve_block(BLOCK_CELLS, BLOCK_CELLS, rng)
+        for turns in range(4):
+            turned = np.rot90(block, turns)
+            library.extend([turned, turned[:, ::-1]])
+
+    tiles = np.full((height, width), WALL, dtype=np.uint8)
+    span = 2 * BLOCK_CELLS  # Tiles from one block's origin to the next
+    for block_y in range(blocks_y):
+        for block_x in range(blocks_x):
+            block_cols = min(BLOCK_CELLS, cols - block_x * BLOCK_CELLS)
+            block_rows = min(BLOCK_CELLS, rows - block_y * BLOCK_CELLS)
+            if block_cols == BLOCK_CELLS and block_rows == BLOCK_CELLS:
+                block = library[rng.randrange(len(library))]
+            else:
+                block = carve_block(block_cols, block_rows, rng)
+            # Neighbouring blocks share their border walls
+            top, left = block_y * span, block_x * span
+            tiles[top:top + block.shape[0], left:left + block.shape[1]] = block
+
+    # One door through the shared wall for every step of a backtracker over the blocks
+    doors = carve_block(blocks_x, blocks_y, rng)
+    for door_y, door_x in zip(*np.nonzero(doors[1:-1, 1:-1] == FLOOR)):
+        block_x, block_y = door_x // 2, door_y // 2
+        if door_x % 2 == door_y % 2:
+            continue  # A block itself, not a passage between two
+        if door_x % 2:
+            # Between the blocks left and right: a random row of the left block
+            cell = rng.randrange(min(BLOCK_CELLS, rows - block_y * BLOCK_CELLS))
+            tiles[block_y * span + 2 * cell + 1, (block_x + 1) * span] = FLOOR
+        else:
+            # Between the blocks above and below: a random column of the upper block
+            cell = rng.randrange(min(BLOCK_CELLS, cols - block_x * BLOCK_CELLS))
+            tiles[(block_y + 1) * span, block_x * span + 2 * cell + 1] = FLOOR
+
+    return [bytearray(row.tobytes()) for row in tiles]
+
+
+def generate_rooms(width, height, seed=None, room_count=None, min_room=4, max_room=12):
+    """Rectangular rooms joined in sequence by L-shaped corridors.
+
+    Like generate_backtracker, returns one bytearray of tiles per row.
+    """
+    rng = random.Random(seed)
+    rows = [bytearray([WALL]) * width for _ in range(height)]
+    room_count = room_count or max(2, width * height // 300)
+    max_room = min(max_room, width - 2, height - 2)
+    min_room = min(min_room, max_room)
+    if max_room < 1:
+        return rows
+
+    centers = []
+    for _ in range(room_count):
+        room_width = rng.randint(min_room, max_room)
+        room_height = rng.randint(min_room, max_room)
+        left = rng.randint(1, width - room_width - 1)
+        top = rng.randint(1, height - room_height - 1)
+        floor = bytes([FLOOR]) * room_width
+        for row in range(top, top + room_height):
+            rows[row][left:left + room_width] = floor
+        centers.append((left + room_width // 2, top + room_height // 2))
+
+    # Sorting keeps corridors short; each room connects to the next one
+    centers.sort()
+    for (x1, y1), (x2, y2) in zip(centers, centers[1:]):
+        left, right = min(x1, x2), max(x1, x2)
+        rows[y1][left:right + 1] = bytes([FLOOR]) * (right - left + 1)
+        for row in range(min(y1, y2), max(y1, y2) + 1):
+            rows[row][x2] = FLOOR
+
+    return rows
+
+
+def rows_from_buffer(tiles, width, height):
+    return [tiles[row * width:(row + 1) * width] for row in range(height)]
+
+
+def check_grid(grid, source):
+    """Raise ValueError unless grid has a floor tile away from its edge, where Maze spawns entities."""
+    if not any(FLOOR in row[1:-1] for row in grid[1:-1]):
+        raise ValueError(f"{source} has no floor tile inside its outer border "
+                         f"({len(grid[0]) if grid else 0}x{len(grid)} tiles)")
+    return grid
+
+
+def load_maze(path):
+    """Read a map stored as text, one line per row, '#' or '1' for walls and anything else for floor."""
+    with open(path) as file:
+        lines = [line.rstrip("\n") for line in file if line.strip()]
+    width = max((len(line) for line in lines), default=0)
+    # Short lines are padded with wall
+    return check_grid([[WALL if char in "#1" else FLOOR for char in line.ljust(width, "#")]
+                       for line in lines], path)
+
+
+def save_maze(grid, path):
+    """Write a grid in the text format read by load_maze."""
+    with open(path, "w") as file:
+        for row in grid:
+            file.write("".join("#" if tile == WALL else "." for tile in row) + "\n")
+
+
+GENERATORS = {
+    "backtracker": generate_backtracker,
+    "rooms": generate_rooms
+}
+
+
+def build_grid(variant="stock", width=None, height=None, seed=None):
+    """Grid for a maze variant: "stock", a generator name, or a path to a map file."""
+    if variant == "stock":
+        return [list(row) for row in MAZE]
+    if variant in GENERATORS:
+        return check_grid(GENERATORS[variant](width, height, seed),
+                          f"generated {variant} maze")
+    return load_maze(variant)
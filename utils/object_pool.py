@@ -0,0 +1,57 @@
+class ObjectPool:
+    """Hands out recycled objects instead of creating new ones for the garbage collector.
+
+    capacity objects are created up front. Released objects go back on the free
+    list unless it already holds high_water objects, in which case they are dropped.
+    acquire's arguments go to factory for new objects and to reset for recycled ones.
+    """
+
+    def __init__(self, factory, capacity=0, high_water=None, reset=None):
+        self.factory = factory
+        self.reset = reset
+        self.high_water = high_water
+        self.free = [factory() for _ in range(capacity)]
+        self.active = []  # Acquired and not yet released
+        self.created = capacity
+        self.reused = 0  # Acquires served from the free list, i.e. allocations avoided
+        self.dropped = 0
+        self.peak_in_use = 0
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            if self.reset is not None:
+                self.reset(obj, *args)
+            self.reused += 1
+        else:
+            obj = self.factory(*args)
+            self.created += 1
+        self.active.append(obj)
+        self.peak_in_use = max(self.peak_in_use, len(self.active))
+        return obj
+
+    def release(self, obj):
+        self.active.remove(obj)
+        self.recycle(obj)
+
+    def release_all(self):
+        """Release every acquired object, e.g. at the end of a round."""
+        for obj in self.active:
+            self.recycle(obj)
+        self.active = []
+
+    def recycle(self, obj):
+        if self.high_water is None or len(self.free) < self.high_water:
+            self.free.append(obj)
+        else:
+            self.dropped += 1
+
+    def stats(self):
+        return {
+            "created": self.created,
+            "allocations_avoided": self.reused,
+            "dropped": self.dropped,
+            "in_use": len(self.active),
+            "peak_in_use": self.peak_in_use,
+            "free": len(self.free)
+        }
@@ -0,0 +1,83 @@
+import time
+from constants.game_rules import GAME_RULES
+from utils.sim_clock import sim_clock
+
+# Nodes searched between two clock checks when only the time budget is set
+TIME_SLICE_NODES = 50
+
+
+class PathScheduler:
+    """Spreads A* or HPA* replanning over ticks within a node and time budget.
+
+    Each tick, enemies whose path no longer leads to their target are ranked:
+    searches left unfinished last tick first, then enemies with no path at
+    all, then by distance to the target divided by how stale their path is.
+    They are replanned in that order until the budget runs out; the rest keep
+    following their old path. Searches are resumable, so the one the budget
+    runs out in carries on next tick and no single search can overrun it.
+
+    The node budget is the default because it is deterministic: the same
+    enemies get planned on every machine, which seeded matches and replays
+    rely on. The optional time budget bounds the planning cost per frame
+    instead, at the price of outcomes that depend on the CPU and its load.
+    """
+
+    def __init__(self, budget_us=None, node_budget=None):
+        self.budget_us = budget_us  # None reads GAME_RULES on every run
+        self.node_budget = node_budget
+        self.planned = 0
+        self.deferred = 0  # Enemy-ticks spent waiting for a turn
+        self.nodes = 0
+        self.max_queue = 0
+
+    def run(self, enemies):
+        budget_ns = (self.budget_us or GAME_RULES["PATH_BUDGET_US"]) * 1000
+        node_budget = self.node_budget or GAME_RULES["PATH_BUDGET_NODES"]
+        tick = sim_clock.ticks
+
+        queue = [enemy for enemy in enemies if enemy.planner is not None or enemy.needs_path()]
+        if not queue:
+            return
+        self.max_queue = max(self.max_queue, len(queue))
+        queue.sort(key=lambda enemy: (enemy.planner is None, bool(enemy.path),
+                                      self.urgency(enemy, tick)))
+
+        start = time.perf_counter_ns()
+        nodes = 0
+        for i, enemy in enumerate(queue):
+            while True:
+                if (node_budget and nodes >= node_budget
+                        or budget_ns and time.perf_counter_ns() - start >= budget_ns):
+                    self.deferred += len(queue) - i
+                    self.nodes += nodes
+                    return
+                if node_budget:
+                    limit = node_budget - nodes
+                else:
+                    limit = TIME_SLICE_NODES if budget_ns else None
+                nodes += enemy.find_path(limit)
+                if enemy.planner is None:
+                    break
+            enemy.planned_tick = tick
+            self.planned += 1
+        self.nodes += nodes
+
+    @staticmethod
+    def urgency(enemy, tick):
+        """Lower is more urgent: near the target, or a path planned long ago."""
+        col, row = enemy.x // GAME_RULES["TILE_SIZE"], enemy.y // GAME_RULES["TILE_SIZE"]
+        distance = abs(col - enemy.target[0]) + abs(row - enemy.target[1])
+        staleness = max(0, tick - enemy.planned_tick) / GAME_RULES["TICK_RATE"]  # Seconds
+        return distance / (1 + staleness)
+
+    def stats(self):
+        return {
+            "planned": self.planned,
+            "deferred": self.deferred,
+            "nodes_expanded": self.nodes,
+            "max_queue": self.max_queue
+        }
+
+
+# Create a singleton instance of PathScheduler
+path_scheduler = PathScheduler()
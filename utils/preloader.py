@@ -0,0 +1,96 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import pygame
+
+from constants.colors import COLORS
+from constants.file_paths import IMAGES_FOLDER, SOUND_FX_FOLDER
+from constants.game_rules import GAME_RULES
+from utils.asset_manager import asset_manager, decode_image, rotate_steps
+from utils.sound_manager import sound_manager, decode_sound
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".bmp")
+SOUND_EXTENSIONS = (".wav", ".ogg")
+
+
+def build_manifest():
+    """Every image and sound effect file in the asset folders from constants/file_paths."""
+    return {
+        "images": sorted(file_name for file_name in os.listdir(IMAGES_FOLDER)
+                         if file_name.lower().endswith(IMAGE_EXTENSIONS)),
+        "sounds": sorted(file_name for file_name in os.listdir(SOUND_FX_FOLDER)
+                         if file_name.lower().endswith(SOUND_EXTENSIONS))
+    }
+
+
+def decode_image_job(file_name, size, rotation_steps):
+    """Worker thread: decode, scale and optionally pre-rotate one image."""
+    start = time.perf_counter()
+    image = decode_image(file_name, size)
+    rotations = rotate_steps(image, rotation_steps) if rotation_steps else None
+    return image, rotations, time.perf_counter() - start
+
+
+def decode_sound_job(file_name):
+    """Worker thread: decode one sound effect."""
+    start = time.perf_counter()
+    sound = decode_sound(file_name)
+    return sound, time.perf_counter() - start
+
+
+def draw_loading_screen(surface, done, total):
+    """Progress bar in the middle of the screen."""
+    width, height = surface.get_size()
+    surface.fill(COLORS["DARK_SLATE"])
+    bar = pygame.Rect(0, 0, width // 3, 20)
+    bar.center = (width // 2, height // 2)
+    pygame.draw.rect(surface, COLORS["GRAY"], bar, 2)
+    filled = bar.inflate(-6, -6)
+    filled.width = filled.width * done // max(total, 1)
+    pygame.draw.rect(surface, COLORS["HEALTH_COLOR"], filled)
+    pygame.display.flip()
+
+
+def preload_assets(image_sizes, rotated_images=(), surface=None, threads=None):
+    """Decode the game's images and every sound effect on a thread pool.
+
+    image_sizes and rotated_images are lists of (file name, size); the rotated
+    ones also get their rotation tables. Files missing from the manifest are
+    left to load on demand. While workers decode, the main thread draws a
+    progress bar on surface (if given) and keeps the window responsive. The
+    results are converted to the display format in one batch afterwards,
+    since pygame only allows that on the main thread.
+    """
+    manifest = build_manifest()
+    steps = GAME_RULES["ROTATION_STEPS"]
+    image_jobs = {(file_name, size): 0 for file_name, size in image_sizes
+                  if file_name in manifest["images"]}
+    image_jobs.update({(file_name, size): steps for file_name, size in rotated_images
+                       if file_name in manifest["images"]})
+
+    threads = threads or GAME_RULES["PRELOAD_THREADS"] or os.cpu_count()
+    with ThreadPoolExecutor(threads) as pool:
+        images = {pool.submit(decode_image_job, file_name, size, rotation_steps): (file_name, size)
+                  for (file_name, size), rotation_steps in image_jobs.items()}
+        sounds = {pool.submit(decode_sound_job, file_name): file_name
+                  for file_name in manifest["sounds"]}
+
+        pending = set(images) | set(sounds)
+        total = len(pending)
+        while pending:
+            _, pending = wait(pending, timeout=1 / 30, return_when=FIRST_COMPLETED)
+            pygame.event.pump()  # Keep the window from being reported as frozen
+            if surface is not None:
+                draw_loading_screen(surface, total - len(pending), total)
+
+    # Convert on the main thread, all at once
+    for future, (file_name, size) in images.items():
+        image, rotations, seconds = future.result()
+        asset_manager.add_image(file_name, size, image)
+        asset_manager.load_seconds[(file_name, size)] = seconds
+        if rotations is not None:
+            asset_manager.add_rotations(file_name, size, rotations)
+    for future, file_name in sounds.items():
+        sound_manager.files[file_name], sound_manager.load_seconds[file_name] = future.result()
+    sound_manager.load()
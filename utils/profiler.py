@@ -0,0 +1,153 @@
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+
+import pygame
+
+from constants.game_rules import GAME_RULES
+from utils.hud import hud
+
+# Shared do-nothing context handed out while profiling is off
+_DISABLED = nullcontext()
+
+FRAME_BUDGET_MS = 1000 / 60  # Guide line drawn across the graph
+
+
+class _Phase:
+    """Context manager timing one named section into the profiler."""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns())
+
+
+class Profiler:
+    """Per-phase frame timings with an on-screen graph and Chrome trace export.
+
+    Off by default. While off, phase() returns a shared null context and
+    profiled functions call straight through after one attribute check.
+    """
+
+    def __init__(self, history=None, max_events=None):
+        self.enabled = False
+        self.frame_times = deque(maxlen=history or GAME_RULES["PROFILER_HISTORY"])
+        self.max_events = max_events or GAME_RULES["PROFILER_MAX_TRACE_EVENTS"]
+        self.events = []  # Chrome trace "complete" events
+        self.dropped_events = 0
+        self.frame_phases = {}  # Phase name -> ms spent in it this frame
+        self.averages = {}  # Phase name -> smoothed ms per frame
+        self.totals = {}  # Phase name -> ms spent in it since the last reset
+        self.origin = time.perf_counter_ns()
+        self.frame_start = None
+
+    def reset(self):
+        """Forget everything recorded so far, e.g. between batch matches."""
+        self.frame_times.clear()
+        self.events = []
+        self.dropped_events = 0
+        self.frame_phases = {}
+        self.averages = {}
+        self.totals = {}
+        self.frame_start = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_start = None
+        print(f"Profiler {'on' if self.enabled else 'off'}")
+
+    def phase(self, name):
+        """Time a with-block under name, e.g. with profiler.phase("render"):"""
+        if not self.enabled:
+            return _DISABLED
+        return _Phase(self, name)
+
+    def record(self, name, start, end):
+        elapsed_ms = (end - start) / 1e6
+        self.frame_phases[name] = self.frame_phases.get(name, 0) + elapsed_ms
+        self.totals[name] = self.totals.get(name, 0) + elapsed_ms
+        if len(self.events) < self.max_events:
+            self.events.append({
+                "name": name, "ph": "X", "pid": 0, "tid": 0,
+                "ts": (start - self.origin) / 1000, "dur": (end - start) / 1000
+            })
+        else:
+            self.dropped_events += 1
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = time.perf_counter_ns()
+
+    def end_frame(self):
+        if not self.enabled or self.frame_start is None:
+            return
+        end = time.perf_counter_ns()
+        self.record("frame", self.frame_start, end)
+        self.frame_times.append((end - self.frame_start) / 1e6)
+
+        # Phases that didn't run this frame decay towards zero
+        for name in self.averages.keys() | self.frame_phases.keys():
+            value = self.frame_phases.get(name, 0)
+            self.averages[name] = self.averages.get(name, value) * 0.9 + value * 0.1
+        self.frame_phases = {}
+
+    def draw_overlay(self, surface):
+        """Draw the rolling frame-time graph and phase averages in the top left.
+
+        Returns the screen rect drawn to, or None while disabled.
+        """
+        if not self.enabled:
+            return None
+        width, height = self.frame_times.maxlen, 100
+        scale = 3  # Pixels per millisecond
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 160))
+        for x, frame_ms in enumerate(self.frame_times):
+            bar = min(height, int(frame_ms * scale))
+            color = (80, 220, 80) if frame_ms <= FRAME_BUDGET_MS else (230, 70, 70)
+            pygame.draw.line(overlay, color, (x, height - 1), (x, height - bar))
+        budget_y = height - int(FRAME_BUDGET_MS * scale)
+        pygame.draw.line(overlay, (255, 255, 255), (0, budget_y), (width, budget_y))
+        drawn = surface.blit(overlay, (10, 10))
+
+        y = height + 15
+        for name, ms in sorted(self.averages.items(), key=lambda item: -item[1]):
+            text = hud.get_font(22).render(f"{name}: {ms:.2f} ms", True, (255, 255, 255))
+            drawn.union_ip(surface.blit(text, (10, y)))
+            y += 18
+        return drawn
+
+    def export_trace(self, path):
+        """Write the recorded events as Chrome trace JSON (chrome://tracing, Perfetto)."""
+        with open(path, "w") as file:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, file)
+        print(f"Wrote {len(self.events)} trace events to {path}"
+              f" ({self.dropped_events} dropped)")
+
+
+def profiled(name):
+    """Decorator timing every call of a function as the phase name."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(name, start, time.perf_counter_ns())
+        return wrapper
+    return decorate
+
+
+# Create a singleton instance of Profiler
+profiler = Profiler()
@@ -0,0 +1,75 @@
+import weakref
+
+import pygame
+
+from utils.asset_manager import is_display_format
+
+# Drawn back to front
+LAYERS = ["floor", "projectiles", "enemies", "player", "hud", "crosshair"]
+
+
+class RenderQueue:
+    """Collects (surface, position) pairs per layer and blits each layer in one call.
+
+    flush() draws the layers in LAYERS order with a single Surface.blits per
+    layer, so the draw order no longer depends on the order of submission.
+    A surface that isn't in the display's pixel format, e.g. one built before
+    the window existed or rendered at runtime, is converted once and the
+    copy reused for as long as the original is alive.
+    """
+
+    def __init__(self):
+        self.layers = {layer: [] for layer in LAYERS}
+        self.converted = weakref.WeakKeyDictionary()  # Surface -> display-format copy, or None
+        self.sprites = 0
+        self.blits_calls = 0
+        self.conversions = 0
+
+    def display_format(self, image):
+        """image, or its cached copy in the display's pixel format."""
+        try:
+            converted = self.converted[image]
+        except KeyError:
+            if pygame.display.get_surface() is None:
+                return image  # Convert once there is a display to match
+            converted = None
+            if not is_display_format(image):
+                if image.get_flags() & pygame.SRCALPHA:
+                    converted = image.convert_alpha()
+                else:
+                    converted = image.convert()
+                self.conversions += 1
+            self.converted[image] = converted
+        return image if converted is None else converted
+
+    def submit(self, layer, image, position):
+        """Queue image to be drawn at position (a point or rect) on layer."""
+        self.layers[layer].append((self.display_format(image), position))
+
+    def submit_all(self, layer, sprites):
+        """Queue a list of (image, position) pairs on layer."""
+        self.layers[layer].extend((self.display_format(image), position)
+                                  for image, position in sprites)
+
+    def flush(self, surface):
+        """Draw and empty every layer, back to front; returns the rects drawn to."""
+        rects = []
+        for layer in LAYERS:
+            sprites = self.layers[layer]
+            if sprites:
+                rects.extend(surface.blits(sprites))
+                self.sprites += len(sprites)
+                self.blits_calls += 1
+                sprites.clear()
+        return rects
+
+    def stats(self):
+        return {
+            "sprites": self.sprites,
+            "blits_calls": self.blits_calls,
+            "conversions": self.conversions
+        }
+
+
+# Create a singleton instance of RenderQueue
+render_queue = RenderQueue()
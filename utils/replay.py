@@ -0,0 +1,108 @@
+import struct
+from collections import namedtuple
+
+import pygame
+
+# Movement keys in bit order of TickInput.keys
+MOVE_KEYS = [pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d]
+
+# TickInput.buttons: bit 0 tells whether the left mouse button is held after
+# this tick's events, the bits above count how often it was pressed during them
+BUTTON_HELD = 1
+PRESS_SHIFT = 1
+MAX_PRESSES = 127
+
+MAGIC = b"MZRP"
+VERSION = 2
+# Magic, version, seed, tick rate, screen width and height, final state checksum
+HEADER = struct.Struct("<4sBIHHHI")
+TICK = struct.Struct("<BhhB")  # Key bits, mouse x, mouse y, button byte: 6 bytes a tick
+
+# Everything the simulation reads from the player during one tick
+TickInput = namedtuple("TickInput", ["keys", "mouse_x", "mouse_y", "buttons"])
+
+
+class KeyBits:
+    """Stand-in for pygame.key.get_pressed() backed by TickInput.keys."""
+
+    def __init__(self, bits):
+        self.bits = bits
+
+    def __getitem__(self, key):
+        return key in MOVE_KEYS and bool(self.bits >> MOVE_KEYS.index(key) & 1)
+
+
+class MouseButton:
+    """The left mouse button as seen through the events between two ticks.
+
+    Keeps the presses and the final state rather than the events, so a
+    release and a new press within one tick still leave the button held.
+    """
+
+    def __init__(self):
+        self.held = False
+        self.presses = 0
+
+    def press(self):
+        self.held = True
+        self.presses += 1
+
+    def release(self):
+        self.held = False
+
+    def take(self):
+        """The TickInput.buttons byte for the events so far; starts counting presses afresh."""
+        buttons = pack_buttons(self.held, self.presses)
+        self.presses = 0
+        return buttons
+
+
+def pack_buttons(held, presses):
+    return min(presses, MAX_PRESSES) << PRESS_SHIFT | (BUTTON_HELD if held else 0)
+
+
+def unpack_buttons(buttons):
+    """(held, presses) from a TickInput.buttons byte."""
+    return bool(buttons & BUTTON_HELD), buttons >> PRESS_SHIFT
+
+
+def capture_input(buttons):
+    """Read this tick's input from pygame; buttons is the byte from MouseButton.take()."""
+    pressed = pygame.key.get_pressed()
+    keys = sum(1 << bit for bit, key in enumerate(MOVE_KEYS) if pressed[key])
+    mouse_x, mouse_y = pygame.mouse.get_pos()
+    return TickInput(keys, mouse_x, mouse_y, buttons)
+
+
+class Recording:
+    """The seed of a round plus the input of each of its ticks, saved as compact binary.
+
+    The screen size is kept because mouse positions are screen coordinates
+    around the player, and the final checksum lets a replay check itself.
+    """
+
+    def __init__(self, seed, tick_rate, screen_size, ticks=None, checksum=0):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.screen_size = tuple(screen_size)
+        self.ticks = ticks if ticks is not None else []
+        self.checksum = checksum  # main.world_checksum after the last tick
+
+    def append(self, tick_input):
+        self.ticks.append(tick_input)
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.seed, self.tick_rate,
+                                   *self.screen_size, self.checksum))
+            file.write(b"".join(TICK.pack(*tick_input) for tick_input in self.ticks))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            data = file.read()
+        if data[:4] != MAGIC or data[4:5] != bytes([VERSION]):
+            raise ValueError(f"{path} is not a version {VERSION} replay")
+        _, _, seed, tick_rate, width, height, checksum = HEADER.unpack_from(data)
+        ticks = [TickInput(*values) for values in TICK.iter_unpack(data[HEADER.size:])]
+        return cls(seed, tick_rate, (width, height), ticks, checksum)
@@ -0,0 +1,34 @@
+from constants.game_rules import GAME_RULES
+
+
+class SimulationClock:
+    """Game time that only moves when the simulation advances a fixed tick.
+
+    Mirrors time.time() and pygame.time.get_ticks() so entities can swap it in
+    for the wall clock; a slow frame then delays the game instead of skipping it.
+    """
+
+    def __init__(self, tick_rate=None):
+        self.requested_tick_rate = tick_rate
+        self.reset()
+
+    def reset(self):
+        """Restart at tick 0, picking up GAME_RULES["TICK_RATE"] unless a rate was given."""
+        self.tick_rate = self.requested_tick_rate or GAME_RULES["TICK_RATE"]
+        self.ticks = 0
+
+    def advance(self):
+        """Move time forward by one simulation tick."""
+        self.ticks += 1
+
+    def time(self):
+        """Simulated seconds since the clock started."""
+        return self.ticks / self.tick_rate
+
+    def get_ticks(self):
+        """Simulated milliseconds since the clock started."""
+        return self.ticks * 1000 // self.tick_rate
+
+
+# Create a singleton instance of SimulationClock
+sim_clock = SimulationClock()
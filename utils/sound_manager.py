@@ -1,42 +1,146 @@
 import pygame
 import random
+import time
 from constants.file_paths import SOUND_FX_FOLDER
 
+# Sound name -> files; names with several files pick a random variant per play
+SOUND_FILES = {
+    "plasma_gun": ["plasma_gun_fire_1.wav", "plasma_gun_fire_2.wav",
+                   "plasma_gun_fire_3.wav", "plasma_gun_fire_4.wav"],
+    "mini_gun": ["mini_gun_fire_1.wav", "mini_gun_fire_2.wav",
+                 "mini_gun_fire_3.wav", "mini_gun_fire_4.wav"],
+    "projectile_impact": ["projectile_impact.wav"],
+    "punch": ["punch.wav"],
+    "explode": ["explode.wav"]
+}
+
+# Higher priorities may steal voices from lower ones when every channel is busy
+PRIORITIES = {
+    "explode": 3,
+    "punch": 2,
+    "projectile_impact": 1,
+    "plasma_gun": 0,
+    "mini_gun": 0
+}
+
+# Most voices of each sound playing at once; more steal that sound's oldest voice
+VOICE_LIMITS = {
+    "explode": 4,
+    "punch": 2,
+    "projectile_impact": 6,
+    "plasma_gun": 4,
+    "mini_gun": 4
+}
+
 
 class SoundManager:
+    """Plays sound effects through a small voice scheduler.
+
+    play() only queues a sound; update() starts the queued sounds once per
+    frame, so many identical plays in one frame become a single voice.
+    """
+
     def __init__(self):
-        self.sounds = {
-            "plasma_gun": [
-                pygame.mixer.Sound(f"{SOUND_FX_FOLDER}/plasma_gun_fire_1.wav"),
-                pygame.mixer.Sound(f"{SOUND_FX_FOLDER}/plasma_gun_fire_2.wav"),
-                pygame.mixer.Sound(f"{SOUND_FX_FOLDER}/plasma_gun_fire_3.wav"),
-                pygame.mixer.Sound(f"{SOUND_FX_FOLDER}/plasma_gun_fire_4.wav")
-            ],
-            "mini_gun": [
-                pygame.mixer.Sound(f"{SOUND_FX_FOLDER}/mini_gun_fire_1.wav"),
-                pygame.mixer.Sound(f"{SOUND_FX_FOLDER}/mini_gun_fire_2.wav"),
-                pygame.mixer.Sound(f"{SOUND_FX_FOLDER}/mini_gun_fire_3.wav"),
-                pygame.mixer.Sound(f"{SOUND_FX_FOLDER}/mini_gun_fire_4.wav")
-            ],
-            "projectile_impact": pygame.mixer.Sound(f"{SOUND_FX_FOLDER}/projectile_impact.wav"),
-            "punch": pygame.mixer.Sound(f"{SOUND_FX_FOLDER}/punch.wav"),
-            "explode": pygame.mixer.Sound(f"{SOUND_FX_FOLDER}/explode.wav")
-        }
+        self.enabled = True  # Turned off for headless runs
+        self.random = random.Random()  # Own generator, so sounds don't change seeded games
+        self.pending = {}  # Sound name -> plays queued this frame
+        self.voices = []  # (channel, sound name, start order) of the sounds we started
+        self.started = 0
+        self.coalesced = 0
+        self.stolen = 0
+        self.dropped = 0
+        self.sounds = None  # Sound name -> Sound or list of variants, decoded by load()
+        self.files = {}  # File name -> decoded Sound, e.g. filled by the preloader
+        self.load_seconds = {}  # File name -> seconds spent decoding it
+
+    def load(self):
+        """Decode every sound effect; needs the mixer, so call it during startup."""
+        if self.sounds is not None:
+            return
+        self.sounds = {}
+        for sound_name, files in SOUND_FILES.items():
+            variants = [self.load_sound(file_name) for file_name in files]
+            self.sounds[sound_name] = variants if len(variants) > 1 else variants[0]
+
+    def load_sound(self, file_name):
+        sound = self.files.get(file_name)
+        if sound is None:
+            start = time.perf_counter()
+            sound = self.files[file_name] = decode_sound(file_name)
+            self.load_seconds[file_name] = time.perf_counter() - start
+        return sound
 
     def play(self, sound_name):
-        if sound_name in self.sounds:
+        """Queue a sound to start on the next update()."""
+        if self.enabled and sound_name in SOUND_FILES:
+            if sound_name in self.pending:
+                self.coalesced += 1
+            self.pending[sound_name] = self.pending.get(sound_name, 0) + 1
+
+    def update(self):
+        """Start this frame's queued sounds, most important first."""
+        if not self.pending:
+            return
+        self.load()  # Normally done up front by initialize_game
+        # Forget voices that finished on their own
+        self.voices = [voice for voice in self.voices if voice[0].get_busy()]
+
+        for sound_name in sorted(self.pending, key=PRIORITIES.get, reverse=True):
+            channel = self.get_channel(sound_name)
+            if channel is None:
+                self.dropped += 1
+                continue
+
             sound = self.sounds[sound_name]
 
             # Round robin
             if isinstance(sound, list):  # Check if it's a list of sounds
-                sound = random.choice(sound)  # Randomly choose one sound
-
-            # Find an available channel and play the sound
-            channel = pygame.mixer.find_channel()
-            if channel:
-                channel.play(sound)
-            else:
-                print(f"Warning: No available channel for {sound_name}!")
+                sound = self.random.choice(sound)  # Randomly choose one sound
+
+            channel.play(sound)
+            self.started += 1
+            self.voices.append((channel, sound_name, self.started))
+        self.pending.clear()
+
+    def get_channel(self, sound_name):
+        """Return a channel for sound_name, stopping another voice if needed, or None."""
+        # At the cap, the oldest voice of the same sound makes way
+        same = [voice for voice in self.voices if voice[1] == sound_name]
+        if len(same) >= VOICE_LIMITS[sound_name]:
+            return self.steal(same[0])
+
+        channel = pygame.mixer.find_channel()
+        if channel is not None:
+            return channel
+
+        # Every channel is busy: take the least important, quietest, oldest voice
+        # unless it matters more than this sound
+        if not self.voices:
+            return None
+        victim = min(self.voices, key=lambda voice: (
+            PRIORITIES[voice[1]], voice[0].get_volume(), voice[2]))
+        if PRIORITIES[victim[1]] > PRIORITIES[sound_name]:
+            return None
+        return self.steal(victim)
+
+    def steal(self, voice):
+        self.voices.remove(voice)
+        self.stolen += 1
+        voice[0].stop()
+        return voice[0]
+
+    def stats(self):
+        return {
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "stolen": self.stolen,
+            "dropped": self.dropped
+        }
+
+
+def decode_sound(file_name):
+    """Decode a sound effect; needs the mixer, but worker threads may call it."""
+    return pygame.mixer.Sound(f"{SOUND_FX_FOLDER}/{file_name}")
 
 
 # Create a singleton instance of SoundManager
@@ -0,0 +1,50 @@
+import numpy as np
+
+# Multiplier packing (cell_x, cell_y) into one integer key; cells stay far below this
+KEY_STRIDE = 1 << 20
+
+
+class SpatialHash:
+    """Uniform grid broadphase over a set of points, rebuilt once per tick.
+
+    Points are bucketed by cell by sorting their cell keys, so a query only
+    looks at the points in the 3x3 block of cells around a position. Each
+    cell must be at least as large as the collision radius used by callers.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.order = np.zeros(0, dtype=np.intp)  # Point indices sorted by cell key
+        self.sorted_keys = np.zeros(0, dtype=np.int64)
+
+    def cell_keys(self, xs, ys):
+        cols = np.floor_divide(xs, self.cell_size).astype(np.int64)
+        rows = np.floor_divide(ys, self.cell_size).astype(np.int64)
+        return cols * KEY_STRIDE + rows
+
+    def rebuild(self, xs, ys):
+        """Index the points given by the coordinate arrays xs and ys."""
+        keys = self.cell_keys(xs, ys)
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+
+    def query_pairs(self, xs, ys):
+        """Every (query, point) pair where point lies in a cell neighbouring query position i.
+
+        All the query positions are resolved in one vectorized pass. Returns
+        two index arrays: into xs/ys and into the indexed points.
+        """
+        cols = np.floor_divide(xs, self.cell_size).astype(np.int64)
+        rows = np.floor_divide(ys, self.cell_size).astype(np.int64)
+
+        # The three cells of each neighbouring column are consecutive keys
+        first_keys = ((cols[:, None] + np.array([-1, 0, 1])) * KEY_STRIDE + rows[:, None] - 1).ravel()
+        starts = np.searchsorted(self.sorted_keys, first_keys, side="left")
+        lengths = np.searchsorted(self.sorted_keys, first_keys + 2, side="right") - starts
+
+        # Expand each (start, length) run into consecutive positions in self.order
+        total = int(lengths.sum())
+        run_offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.repeat(starts, lengths) + np.arange(total) - run_offsets
+        queries = np.repeat(np.arange(len(xs)).repeat(3), lengths)
+        return queries, self.order[positions]
@@ -0,0 +1,34 @@
+import pygame
+
+
+class Window:
+    """The game window, opened on first use so importing the game needs no display."""
+
+    def __init__(self):
+        self.surface = None
+        self.size = None
+
+    def get_size(self):
+        """Window size in pixels: the desktop resolution unless the window is open."""
+        if self.size is None:
+            pygame.display.init()
+            info = pygame.display.Info()
+            self.size = info.current_w, info.current_h
+        return self.size
+
+    def set_size(self, size):
+        """Use size instead of the desktop resolution, e.g. to replay a recording from another screen."""
+        self.size = tuple(size)
+        if self.surface is not None and self.surface.get_size() != self.size:
+            self.surface = pygame.display.set_mode(self.size)
+
+    def get_surface(self):
+        """Return the display surface, opening the window the first time."""
+        if self.surface is None:
+            self.surface = pygame.display.set_mode(self.get_size())
+            self.size = self.surface.get_size()
+        return self.surface
+
+
+# Create a singleton instance of Window
+window = Window()